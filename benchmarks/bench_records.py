@@ -0,0 +1,264 @@
+"""
+Benchmarks of record construction, getters, dates and bulk reading
+
+The classes follow the conventions of asv (airspeed velocity): setup is
+called with the parameters before timing, time_* methods are timed and
+track_* methods report a value. They can be run with asv or with
+benchmarks/run.py, which reports records per second and memory.
+
+Timings are cold: records are parsed and date caches are cleared in setup,
+which runs before each single timed call (number = 1), so caches built on
+first access (holdings, holdings indexes, subfield index, parsed dates) are
+part of the timing.
+"""
+
+import os
+import shutil
+import inspect
+import tempfile
+import tracemalloc
+
+from serialj import dateparse, utils
+from serialj.stream import record_class, stream_records
+
+from .generator import generate, write_ndjson
+
+
+# number of records and their shape, see generator.generate
+SETTINGS = {
+    "records": 1000,
+    "seed": 0,
+    "fields": 20,
+    "holdings": 3,
+    "repeat": 2,
+}
+
+FORMATS = ["pica", "marc"]
+VARIANTS = ["plain", "subfield_index", "lazy", "compact"]
+
+_generated = {}
+_arguments_cache = {}
+
+
+def records(format):
+    """
+    Synthetic records of given format with current settings (memoized)
+    """
+    key = (format,) + tuple(sorted(SETTINGS.items()))
+    if key not in _generated:
+        _generated[key] = generate(SETTINGS["records"], format=format, seed=SETTINGS["seed"],
+                                   fields=SETTINGS["fields"], holdings=SETTINGS["holdings"],
+                                   repeat=SETTINGS["repeat"])
+    return _generated[key]
+
+
+def parsed(format, variant="plain"):
+    """
+    Synthetic records of given format parsed with given variant
+    """
+    cls, kwargs, inputs = _variant(format, variant)
+    return [cls(data, **kwargs) for data in inputs]
+
+
+def _variant(format, variant):
+    data = records(format)
+    kwargs = {"level": 100}
+    if variant == "lazy":
+        return record_class(format, lazy=True), kwargs, [utils.dumps(d) for d in data]
+    if variant == "compact":
+        return record_class(format, compact=True), kwargs, data
+    if variant == "subfield_index":
+        kwargs["subfield_index"] = True
+    return record_class(format), kwargs, data
+
+
+def _arguments(record):
+    """
+    Key values (EPN, ILN, ISIL, ELN) of the first holding of record
+    """
+    if record.__class__.__name__.endswith("PicaJson"):
+        holdings = record.holdings()
+        if len(holdings) > 0:
+            return {"epn": holdings[0].epn, "iln": holdings[0].iln, "isil": holdings[0].isil, "eln": holdings[0].eln}
+    else:
+        epns = record.get_holdings_epn()
+        isils = record.get_holdings_isil()
+        if epns and isils:
+            return {"epn": epns[0], "isil": isils[0]}
+    return {}
+
+
+def arguments(format):
+    """
+    Key values of the first holding of each record (memoized), taken from
+    separately parsed records to keep the caches of timed records cold
+    """
+    key = (format,) + tuple(sorted(SETTINGS.items()))
+    if key not in _arguments_cache:
+        _arguments_cache[key] = [_arguments(record) for record in parsed(format)]
+    return _arguments_cache[key]
+
+
+def _getters(format, prefix="get_holdings_"):
+    cls = record_class(format)
+    return sorted(name for name, _ in inspect.getmembers(cls, inspect.isfunction) if name.startswith(prefix))
+
+
+def _call_all(records, getter, arguments):
+    names = [p for p in inspect.signature(getattr(records[0].__class__, getter)).parameters if p in ("epn", "iln", "isil", "eln")]
+    for record, args in zip(records, arguments):
+        if all(name in args for name in names):
+            getattr(record, getter)(**{name: args[name] for name in names})
+
+
+class Benchmark:
+    """
+    Base of benchmarks with setup before each single timed call
+    """
+
+    number = 1
+    warmup_time = 0
+
+
+class Construction(Benchmark):
+    """
+    Parse records from decoded JSON (or raw JSON for lazy records)
+    """
+
+    params = [FORMATS, VARIANTS]
+    param_names = ["format", "variant"]
+
+    def setup(self, format, variant):
+        self.cls, self.kwargs, self.inputs = _variant(format, variant)
+
+    def time_construct(self, format, variant):
+        cls = self.cls
+        kwargs = self.kwargs
+        for data in self.inputs:
+            cls(data, **kwargs)
+
+    def track_memory(self, format, variant):
+        # decoding is included, decoded rows are kept by all but lazy records
+        raws = [utils.dumps(data) for data in records(format)]
+        lazy = variant == "lazy"
+        tracemalloc.start()
+        try:
+            before = tracemalloc.get_traced_memory()[0]
+            kept = [self.cls(raw if lazy else utils.loads(raw), **self.kwargs) for raw in raws]
+            after = tracemalloc.get_traced_memory()[0]
+        finally:
+            tracemalloc.stop()
+        del kept
+        return (after - before) / len(raws)
+
+    track_memory.unit = "bytes/record"
+
+
+class PicaHoldings(Benchmark):
+    """
+    Call each holdings getter of PicaJson on all records
+    """
+
+    params = [_getters("pica")]
+    param_names = ["getter"]
+
+    def setup(self, getter):
+        self.arguments = arguments("pica")
+        self.records = parsed("pica")
+
+    def time_getter(self, getter):
+        _call_all(self.records, getter, self.arguments)
+
+
+class MarcHoldings(Benchmark):
+    """
+    Call each holdings getter of MarcJson on all records
+    """
+
+    params = [_getters("marc")]
+    param_names = ["getter"]
+
+    def setup(self, getter):
+        self.arguments = arguments("marc")
+        self.records = parsed("marc")
+
+    def time_getter(self, getter):
+        _call_all(self.records, getter, self.arguments)
+
+
+class Dates(Benchmark):
+    """
+    Convert dates and timestamps of all records with cold date caches
+    """
+
+    params = [[
+        "pica:get_first_entry_date_date",
+        "pica:get_latest_change_datetime",
+        "pica:get_holdings_first_entry_date_date",
+        "pica:get_holdings_latest_change_datetime",
+        "pica:get_holdings_new_date_date",
+        "marc:get_latest_trans_datetime",
+        "marc:get_date_entered_date",
+    ]]
+    param_names = ["getter"]
+
+    def setup(self, getter):
+        format, self.getter = getter.split(":")
+        self.records = parsed(format)
+        dateparse.cache_clear()
+
+    def time_convert(self, getter):
+        for record in self.records:
+            getattr(record, self.getter)()
+
+
+class BulkReading(Benchmark):
+    """
+    Stream records from an NDJSON dump with each installed JSON backend
+    """
+
+    params = [FORMATS, list(utils.JSON_BACKENDS), ["plain", "lazy", "compact"]]
+    param_names = ["format", "backend", "variant"]
+
+    def setup(self, format, backend, variant):
+        try:
+            utils.set_json_backend(backend)
+        except ImportError:
+            utils.set_json_backend()
+            raise NotImplementedError("JSON backend {0} not installed".format(backend))
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, "records.ndjson")
+        write_ndjson(self.path, records(format))
+
+    def teardown(self, format, backend, variant):
+        utils.set_json_backend()
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def time_stream_records(self, format, backend, variant):
+        for record in stream_records(self.path, format=format, lazy=variant == "lazy",
+                                     compact=variant == "compact", level=100):
+            record.get_ppn()
+
+
+class SubfieldIndex(Benchmark):
+    """
+    Call holdings getters which look up the same fields and subfields
+    (count, index and values of EPN, ISIL, signature, status) with and
+    without the subfield index, in one pass over fresh records (including
+    building the index) and in repeated passes
+    """
+
+    params = [FORMATS, [False, True], [1, 10]]
+    param_names = ["format", "subfield_index", "passes"]
+
+    def setup(self, format, subfield_index, passes):
+        self.records = parsed(format, "subfield_index" if subfield_index else "plain")
+        self.arguments = arguments(format)
+        self.getters = ["get_holdings_epn", "get_holdings_isil", "get_holdings_signature", "get_holdings_status"]
+        if format == "pica":
+            self.getters += ["get_holdings_epn_count", "get_holdings_isil_count", "get_holdings_isil_index"]
+
+    def time_holdings_lookups(self, format, subfield_index, passes):
+        for _ in range(passes):
+            for getter in self.getters:
+                _call_all(self.records, getter, self.arguments)
@@ -0,0 +1,124 @@
+"""
+Deterministic generator of synthetic PICA and MARC JSON records
+
+The same seed and parameters always yield the same records, so results
+can be compared across versions. Records can be tuned by the number of
+bibliographic fields, holdings and repetitions of subfields.
+"""
+
+import json
+import random
+
+
+ISILS = ("DE-14", "DE-15", "DE-105", "DE-Ch1", "DE-D161", "DE-L229", "DE-520", "DE-Zi4")
+STATUS = ("u", "b", "c", "d", "e", "g", "i", "s", "z")
+PICA_FIELDS = ("002@", "006Z", "007A", "010@", "011@", "013D", "021A", "027A", "028A", "033A",
+               "034D", "036E", "037A", "041A", "044K", "045E", "047A", "060R", "144Z", "145Z")
+MARC_FIELDS = ("020", "035", "040", "041", "082", "084", "100", "245", "250", "264",
+               "300", "336", "490", "500", "650", "689", "700", "776", "830", "856")
+SUBFIELDS = "abcdefghx"
+
+
+def _pica_date(rng):
+    return "{0:02d}-{1:02d}-{2:02d}".format(rng.randint(1, 28), rng.randint(1, 12), rng.randint(0, 99))
+
+
+def _pica_time(rng):
+    return "{0:02d}:{1:02d}:{2:02d}.000".format(rng.randint(0, 23), rng.randint(0, 59), rng.randint(0, 59))
+
+
+def _marc_stamp(rng):
+    return "{0}{1:02d}{2:02d}{3:02d}{4:02d}{5:02d}.0".format(
+        rng.randint(1990, 2025), rng.randint(1, 12), rng.randint(1, 28),
+        rng.randint(0, 23), rng.randint(0, 59), rng.randint(0, 59))
+
+
+def _words(rng, n=3):
+    return " ".join("w{0}".format(rng.randint(0, 9999)) for _ in range(n))
+
+
+def _subfields(rng, repeat):
+    row = []
+    for code in rng.sample(SUBFIELDS, rng.randint(1, 4)):
+        for _ in range(rng.randint(1, repeat)):
+            row.extend([code, _words(rng)])
+    return row
+
+
+def pica_record(rng, ppn, fields=20, holdings=3, repeat=2):
+    """
+    Synthetic PICA JSON record with given number of bibliographic fields,
+    holdings (level 1 and 2 blocks) and maximum subfield repetitions
+    """
+    data = [
+        ["001A", "", "0", "1100:" + _pica_date(rng)],
+        ["001B", "", "0", "{0}:{1}".format(rng.randint(1000, 9999), _pica_date(rng)), "t", _pica_time(rng)],
+        ["001D", "", "0", "0000:" + _pica_date(rng)],
+        ["003@", "", "0", str(ppn)],
+    ]
+    for i in range(fields):
+        data.append([PICA_FIELDS[i % len(PICA_FIELDS)], ""] + _subfields(rng, repeat))
+    for _ in range(rng.randint(0, 3)):
+        data.append(["045R", "", "a", "ST {0}".format(rng.randint(100, 999))])
+    data.sort(key=lambda row: row[0])
+    for i in range(holdings):
+        iln = str(rng.randint(1, 400))
+        eln = str(rng.randint(1000, 9999))
+        data.append(["101@", "", "a", iln])
+        data.append(["201A", "01", "0", _pica_date(rng)])
+        data.append(["201B", "01", "0", _pica_date(rng), "t", _pica_time(rng)])
+        data.append(["201D", "01", "0", "{0}:{1}".format(eln, _pica_date(rng))])
+        data.append(["203@", "01", "0", str(ppn * 100 + i)])
+        data.append(["208@", "01", "a", _pica_date(rng), "b", "a{0}".format(rng.randint(0, 9))])
+        row = ["209A", "01", "B", rng.choice(ISILS), "f", "000", "a", "SIG {0}".format(rng.randint(0, 99999)),
+               "d", rng.choice(STATUS)]
+        for _ in range(rng.randint(0, repeat - 1)):
+            row.extend(["a", "SIG {0}".format(rng.randint(0, 99999))])
+        row.extend(["x", "00"])
+        data.append(row)
+        if rng.random() < 0.3:
+            data.append(["209R", "01", "u", "https://example.org/{0}".format(rng.randint(0, 99999))])
+    return data
+
+
+def marc_record(rng, ppn, fields=20, holdings=3, repeat=2):
+    """
+    Synthetic MARC JSON record with given number of variable data fields,
+    holdings (924) and maximum subfield repetitions
+    """
+    entered = _marc_stamp(rng)
+    data = [
+        ["001", None, None, "_", str(ppn)],
+        ["003", None, None, "_", "DE-627"],
+        ["005", None, None, "_", _marc_stamp(rng)],
+        ["008", None, None, "_", entered[2:8] + "s" + entered[:4] + "    gw            000 0 ger d"],
+    ]
+    for i in range(fields):
+        data.append([MARC_FIELDS[i % len(MARC_FIELDS)], rng.choice(" 01"), rng.choice(" 04")] + _subfields(rng, repeat))
+    data.sort(key=lambda row: row[0])
+    for i in range(holdings):
+        row = ["924", rng.choice("01"), " ", "a", str(ppn * 100 + i), "b", rng.choice(ISILS),
+               "d", rng.choice(STATUS), "g", "SIG {0}".format(rng.randint(0, 99999))]
+        for _ in range(rng.randint(0, repeat - 1)):
+            row.extend(["g", "SIG {0}".format(rng.randint(0, 99999))])
+        data.append(row)
+    return data
+
+
+def generate(n, format="pica", seed=0, fields=20, holdings=3, repeat=2):
+    """
+    Generate list of n synthetic records in given format (pica or marc)
+    """
+    rng = random.Random(seed)
+    make = marc_record if format == "marc" else pica_record
+    return [make(rng, 100000000 + i, fields=fields, holdings=holdings, repeat=repeat) for i in range(n)]
+
+
+def write_ndjson(path, records):
+    """
+    Write records as NDJSON to file at given path
+    """
+    with open(path, "w", encoding="utf-8") as f:
+        for data in records:
+            f.write(json.dumps(data, ensure_ascii=False))
+            f.write("\n")
@@ -0,0 +1,99 @@
+"""
+Run benchmarks without asv and report records per second and memory
+
+python benchmarks/run.py --records 2000 --holdings 10 --filter Construction
+"""
+
+import gc
+import os
+import sys
+import time
+import argparse
+import itertools
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks import bench_records  # noqa: E402
+
+
+BENCHMARKS = (
+    bench_records.Construction,
+    bench_records.PicaHoldings,
+    bench_records.MarcHoldings,
+    bench_records.Dates,
+    bench_records.BulkReading,
+    bench_records.SubfieldIndex,
+)
+
+
+def _best(cls, method, params, repeat):
+    # fresh setup before each timing run, as with asv and number = 1
+    best = None
+    for _ in range(repeat):
+        bench = cls()
+        try:
+            bench.setup(*params)
+        except NotImplementedError:
+            return None
+        # garbage collection is disabled while timing, as with timeit
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            getattr(bench, method)(*params)
+            elapsed = time.perf_counter() - start
+        finally:
+            gc.enable()
+            if hasattr(bench, "teardown"):
+                bench.teardown(*params)
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+
+def run(pattern=None, repeat=3):
+    """
+    Run benchmarks matching pattern and yield (name, value, unit)
+    """
+    for cls in BENCHMARKS:
+        methods = [name for name in dir(cls) if name.startswith(("time_", "track_"))]
+        for params in itertools.product(*cls.params):
+            for method in methods:
+                name = "{0}.{1}({2})".format(cls.__name__, method, ", ".join(str(p) for p in params))
+                if pattern is not None and pattern not in name:
+                    continue
+                if method.startswith("time_"):
+                    elapsed = _best(cls, method, params, repeat)
+                    if elapsed is not None:
+                        yield name, bench_records.SETTINGS["records"] / elapsed, "records/s"
+                    continue
+                bench = cls()
+                try:
+                    bench.setup(*params)
+                except NotImplementedError:
+                    continue
+                try:
+                    func = getattr(bench, method)
+                    yield name, func(*params), getattr(func, "unit", "")
+                finally:
+                    if hasattr(bench, "teardown"):
+                        bench.teardown(*params)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run serialj benchmarks on synthetic records")
+    parser.add_argument("--records", type=int, default=bench_records.SETTINGS["records"], help="number of records")
+    parser.add_argument("--seed", type=int, default=bench_records.SETTINGS["seed"], help="seed of record generator")
+    parser.add_argument("--fields", type=int, default=bench_records.SETTINGS["fields"], help="bibliographic fields per record")
+    parser.add_argument("--holdings", type=int, default=bench_records.SETTINGS["holdings"], help="holdings per record")
+    parser.add_argument("--repeat", type=int, default=bench_records.SETTINGS["repeat"], help="maximum repetitions of subfields")
+    parser.add_argument("--runs", type=int, default=3, help="timing runs per benchmark, each after a fresh setup (best is reported)")
+    parser.add_argument("--filter", default=None, help="run only benchmarks containing this string")
+    args = parser.parse_args()
+    for key in ("records", "seed", "fields", "holdings", "repeat"):
+        bench_records.SETTINGS[key] = getattr(args, key)
+    for name, value, unit in run(pattern=args.filter, repeat=args.runs):
+        print("{0:<90} {1:>14,.1f} {2}".format(name, value, unit))
+
+
+if __name__ == "__main__":
+    main()
@@ -3,8 +3,23 @@ Parse JSON serialized MARC and PICA data
 """
 
 __author__ = "Donatus Herre <donatus.herre@slub-dresden.de>"
-__version__ = "0.2.16"
+__version__ = "0.3.0"
 
 from . import utils
+from . import binary
+from . import cache
+from . import dateparse
+from . import delta
+from . import dumpindex
+from . import instrument
+from . import parallel
+from . import schema
+from . import writer
 from .marcjson import MarcJson
 from .picajson import PicaJson
+from .collection import RecordCollection
+from .compact import CompactMarcJson, CompactPicaJson
+from .extractor import Extractor
+from .lazy import LazyMarcJson, LazyPicaJson
+from .query import Query
+from .stream import stream_records
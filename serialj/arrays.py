@@ -0,0 +1,175 @@
+"""
+Vectorized extraction of subfield values over batches of records
+
+Values of one field and subfield are collected from many records in a
+single pass into flat NumPy arrays in CSR layout: the values of record i
+are values[offsets[i]:offsets[i + 1]]. Dates and timestamps can then be
+converted to datetime64 in one vectorized step, so aggregations over
+millions of holdings run in NumPy instead of Python loops.
+"""
+
+import collections
+
+from . import dateparse
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+# length, components (start, size), separators, datetime64 unit, fallback parser
+LAYOUTS = {
+    "pica_date": (8, {"d": (0, 2), "m": (3, 2), "y": (6, 2)},
+                  {2: "-", 5: "-"}, "D", dateparse.pica_date),
+    "pica_datetime": (21, {"d": (0, 2), "m": (3, 2), "y": (6, 2), "H": (9, 2), "M": (12, 2), "S": (15, 2), "f": (18, 3)},
+                      {2: "-", 5: "-", 8: " ", 11: ":", 14: ":", 17: "."}, "us", dateparse.pica_datetime),
+    "marc_date": (6, {"y": (0, 2), "m": (2, 2), "d": (4, 2)},
+                  {}, "D", dateparse.marc_date),
+    "marc_datetime": (16, {"Y": (0, 4), "m": (4, 2), "d": (6, 2), "H": (8, 2), "M": (10, 2), "S": (12, 2)},
+                      {14: ".", 15: "0"}, "us", dateparse.marc_datetime),
+}
+
+
+def _require_numpy():
+    if numpy is None:
+        raise ImportError("Vectorized extraction requires numpy")
+
+
+class SubfieldArrays(collections.namedtuple("SubfieldArrays", ("values", "record", "occurrence", "offsets"))):
+    """
+    Subfield values of a batch of records with the index of their record
+    and of the field occurrence within that record, and CSR offsets of the
+    values per record
+    """
+
+    __slots__ = ()
+
+    @property
+    def counts(self):
+        """
+        Number of values per record
+        """
+        return numpy.diff(self.offsets)
+
+    def record_values(self, i):
+        """
+        Values of record with given index in batch
+        """
+        return self.values[self.offsets[i]:self.offsets[i + 1]]
+
+
+def subfield_arrays(records, field, subfield, occurrence=None, dtype=str):
+    """
+    Extract values of subfield of field from each of given records
+
+    With occurrence, only fields with given occurrence (PICA) or first
+    indicator (MARC) are considered. Values are returned as array of given
+    dtype, fixed-width unicode by default.
+    """
+    _require_numpy()
+    values = []
+    record_index = []
+    occurrences = []
+    offsets = [0]
+    for i, record in enumerate(records):
+        rows = record._field_rows(field)
+        if rows is not None:
+            k = 0
+            for row in rows:
+                if occurrence is not None and row[1] != occurrence:
+                    continue
+                pos = record._subfield_pos(row, subfield)
+                if pos is not None:
+                    for p in pos:
+                        values.append(row[p])
+                        record_index.append(i)
+                        occurrences.append(k)
+                k += 1
+        offsets.append(len(values))
+    if len(values) == 0:
+        values = numpy.array([], dtype=dtype)
+    else:
+        values = numpy.array(values, dtype=dtype)
+    return SubfieldArrays(values,
+                          numpy.array(record_index, dtype=numpy.intp),
+                          numpy.array(occurrences, dtype=numpy.intp),
+                          numpy.array(offsets, dtype=numpy.int64))
+
+
+def _parse_fixed(codes, length, components, separators):
+    n, width = codes.shape
+    valid = numpy.ones(n, dtype=bool)
+    if width > length:
+        valid &= (codes[:, length:] == 0).all(axis=1)
+    valid &= codes[:, length - 1] != 0
+    for pos, char in separators.items():
+        valid &= codes[:, pos] == ord(char)
+    digits = codes[:, :length].astype(numpy.int64) - ord("0")
+    parsed = {}
+    for name, (start, size) in components.items():
+        block = digits[:, start:start + size]
+        valid &= ((block >= 0) & (block <= 9)).all(axis=1)
+        value = numpy.zeros(n, dtype=numpy.int64)
+        for j in range(size):
+            value = value * 10 + block[:, j]
+        parsed[name] = value
+    return valid, parsed
+
+
+def to_datetime64(values, layout="pica_date"):
+    """
+    Convert array of date or timestamp strings in given layout (pica_date,
+    pica_datetime, marc_date or marc_datetime) to datetime64
+
+    Values in the common fixed-width layout are converted with vectorized
+    arithmetic, other non-empty values are parsed one by one with the
+    parsers of serialj.dateparse. Invalid values are converted to NaT.
+    """
+    _require_numpy()
+    if layout not in LAYOUTS:
+        raise ValueError("Unknown date layout {0}. Expected one of: {1}".format(layout, ", ".join(LAYOUTS)))
+    length, components, separators, unit, parser = LAYOUTS[layout]
+    values = numpy.asarray(values)
+    if values.dtype.kind != "U":
+        values = values.astype(str)
+    values = numpy.ascontiguousarray(values.ravel())
+    n = len(values)
+    dtype = "datetime64[{0}]".format(unit)
+    result = numpy.full(n, numpy.datetime64("NaT"), dtype=dtype)
+    if n == 0:
+        return result
+    width = values.dtype.itemsize // 4
+    if width >= length:
+        codes = values.view(numpy.uint32).reshape(n, width)
+        valid, parsed = _parse_fixed(codes, length, components, separators)
+        if "Y" in parsed:
+            year = parsed["Y"]
+        else:
+            year = numpy.where(parsed["y"] < 69, 2000 + parsed["y"], 1900 + parsed["y"])
+        month = parsed["m"]
+        day = parsed["d"]
+        valid &= (month >= 1) & (month <= 12) & (day >= 1) & (day <= 31)
+        year = numpy.where(valid, year, 1970)
+        month = numpy.where(valid, month, 1)
+        day = numpy.where(valid, day, 1)
+        months = ((year - 1970) * 12 + month - 1).astype("datetime64[M]")
+        days = months.astype("datetime64[D]") + (day - 1).astype("timedelta64[D]")
+        # days beyond the end of month roll over into the next one
+        valid &= days.astype("datetime64[M]") == months
+        converted = days.astype(dtype)
+        if "H" in parsed:
+            valid &= (parsed["H"] < 24) & (parsed["M"] < 60) & (parsed["S"] < 60)
+            micros = ((parsed["H"] * 60 + parsed["M"]) * 60 + parsed["S"]) * 1000000
+            if "f" in parsed:
+                micros = micros + parsed["f"] * 1000
+            converted = converted + micros.astype("timedelta64[us]")
+        result[valid] = converted[valid]
+    else:
+        valid = numpy.zeros(n, dtype=bool)
+    for i in numpy.flatnonzero(~valid & (values != "")):
+        try:
+            result[i] = numpy.datetime64(parser(str(values[i])), unit)
+        except ValueError:
+            pass
+    return result
@@ -0,0 +1,203 @@
+"""
+Binary record cache for repeated processing of the same dump
+
+Records are stored length-prefixed as marshal payloads of their
+precomputed index of field positions and their fields, each field packed
+on its own. Reading them back needs neither JSON decoding nor indexing,
+and fields are only unpacked once they are accessed.
+"""
+
+import gzip
+import struct
+import marshal
+import logging
+
+from .marcjson import MarcJson
+from .picajson import PicaJson
+from .stream import record_class, stream_lines
+from .utils import loads, open_file, set_stream, BUFFER_SIZE
+
+
+logger = logging.getLogger(__name__)
+set_stream(logger)
+
+MAGIC = b"SJBR"
+VERSION = 1
+MARSHAL_VERSION = 4
+
+# magic, version, length of format name
+HEADER = struct.Struct("<4sHB")
+# length of record payload
+LENGTH = struct.Struct("<I")
+
+
+class PackedRecord:
+    """
+    Mixin for records built from packed fields, which are unpacked on demand
+
+    Fields requested via get_field (and thus all getters built on it) are
+    unpacked one by one using the stored index of field positions. All
+    fields are only unpacked once data is accessed.
+    """
+
+    __slots__ = ()
+
+    def __init__(self, packed, idx, **kwargs):
+        self._packed = packed
+        self._rows = {}
+        super().__init__(None, idx=idx, **kwargs)
+
+    @property
+    def data(self):
+        if self._data is None and self._packed is not None:
+            self._data = [marshal.loads(row) for row in self._packed]
+            self._packed = None
+        return self._data
+
+    @data.setter
+    def data(self, value):
+        self._data = value
+
+    @property
+    def unpacked(self):
+        """
+        Whether all fields of the record have been unpacked
+        """
+        return self._packed is None
+
+    def _field_rows(self, name):
+        if self._packed is None:
+            return super()._field_rows(name)
+        rows = self._rows.get(name)
+        if rows is None:
+            positions = self.idx.get(name)
+            if positions is None:
+                return None
+            rows = self._rows[name] = [marshal.loads(self._packed[i]) for i in positions]
+        return rows
+
+
+class PackedPicaJson(PackedRecord, PicaJson):
+    """
+    Class for parsing PICA JSON (http://format.gbv.de/pica/json) from packed fields
+    """
+
+    __slots__ = ("_packed", "_rows", "_data")
+
+
+class PackedMarcJson(PackedRecord, MarcJson):
+    """
+    Class for parsing MARC JSON (http://format.gbv.de/marc/json) from packed fields
+    """
+
+    __slots__ = ("_packed", "_rows", "_data")
+
+
+PACKED_FORMATS = {
+    PicaJson: PackedPicaJson,
+    MarcJson: PackedMarcJson,
+}
+
+
+class BinaryWriter:
+    """
+    Write records to binary record cache at given path
+
+    Records can be given as PicaJson/MarcJson objects or as decoded JSON.
+    With compress=True, the file is compressed with gzip.
+    """
+
+    def __init__(self, path, format="pica", compress=False):
+        self.cls = record_class(format)
+        self.count = 0
+        if compress:
+            self.file = gzip.open(path, "wb")
+        else:
+            self.file = open(path, "wb", buffering=BUFFER_SIZE)
+        name = format.encode("utf-8")
+        self.file.write(HEADER.pack(MAGIC, VERSION, len(name)))
+        self.file.write(name)
+
+    def write(self, record):
+        """
+        Write record (or decoded JSON of record)
+        """
+        if not isinstance(record, self.cls):
+            record = self.cls(record)
+        data = record.data
+        if hasattr(data, "tolist"):
+            data = data.tolist()
+        idx = {tag: list(positions) for tag, positions in record.idx.items()}
+        packed = [marshal.dumps(list(row), MARSHAL_VERSION) for row in data]
+        payload = marshal.dumps((idx, packed), MARSHAL_VERSION)
+        self.file.write(LENGTH.pack(len(payload)))
+        self.file.write(payload)
+        self.count += 1
+
+    def write_many(self, records):
+        """
+        Write each of given records
+        """
+        for record in records:
+            self.write(record)
+        return self.count
+
+    def close(self):
+        """
+        Close file
+        """
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def convert(path, binary_path, format="pica", compress=False):
+    """
+    Convert (compressed) NDJSON dump at given path to binary record cache
+
+    Returns the number of converted records.
+    """
+    with BinaryWriter(binary_path, format=format, compress=compress) as writer:
+        for i, line in enumerate(stream_lines(path), start=1):
+            try:
+                data = loads(line)
+            except ValueError as err:
+                logger.error("Skipping invalid record {0} in file {1}: {2}".format(i, path, err))
+                continue
+            writer.write(data)
+        return writer.count
+
+
+def read_records(binary_path, buffering=BUFFER_SIZE, **kwargs):
+    """
+    Yield records of binary record cache at given path one by one
+
+    Records are yielded as PackedPicaJson or PackedMarcJson according to
+    the format stored in the file. Additional keyword arguments are passed
+    to the record class.
+    """
+    with open_file(binary_path, buffering=buffering) as f:
+        magic, version, format_len = HEADER.unpack(f.read(HEADER.size))
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("Invalid binary record file {0}".format(binary_path))
+        cls = PACKED_FORMATS[record_class(f.read(format_len).decode("utf-8"))]
+        read = f.read
+        length_size = LENGTH.size
+        unpack = LENGTH.unpack
+        marshal_loads = marshal.loads
+        while True:
+            prefix = read(length_size)
+            if len(prefix) < length_size:
+                if len(prefix) > 0:
+                    raise ValueError("Truncated binary record file {0}".format(binary_path))
+                break
+            length, = unpack(prefix)
+            payload = read(length)
+            if len(payload) < length:
+                raise ValueError("Truncated binary record file {0}".format(binary_path))
+            idx, packed = marshal_loads(payload)
+            yield cls(packed, idx, **kwargs)
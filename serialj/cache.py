@@ -0,0 +1,222 @@
+import time
+import sqlite3
+import collections
+
+from .compact import CompactData
+from .delta import record_stamp
+from .picajson import PicaJson
+from .stream import record_class
+from .utils import dumps, loads
+
+
+MAX_SIZE = 10000
+TTL = 3600
+# share of time since latest change a record is cached for with max_ttl
+STAMP_FACTOR = 0.1
+COMMIT_INTERVAL = 1000
+
+Entry = collections.namedtuple("Entry", ("expires", "stamp", "record"))
+
+
+def change_datetime(record):
+    """
+    Latest change (PICA 001B, MARC 005) of record as datetime object,
+    None if missing or invalid
+    """
+    try:
+        if isinstance(record, PicaJson):
+            if record.get_latest_change() is None:
+                return None
+            return record.get_latest_change_datetime()
+        return record.get_latest_trans_datetime()
+    except (AttributeError, IndexError, TypeError, ValueError):
+        return None
+
+
+def _record_data(record):
+    data = record.data
+    if isinstance(data, CompactData):
+        return data.tolist()
+    return data
+
+
+class RecordCache:
+    """
+    Cache of records keyed by PPN with TTL and LRU eviction
+
+    Records are kept in memory, the least recently used record is evicted
+    once maxsize records are cached. With a path, records are also stored
+    in an SQLite database and loaded from there on a miss in memory. Each
+    record expires ttl seconds after being cached. With max_ttl set, the
+    TTL grows with the time since the latest change of the record (001B,
+    005), up to max_ttl, since records unchanged for long change rarely.
+    Hits, misses, expirations and evictions are counted in stats.
+    """
+
+    def __init__(self, maxsize=MAX_SIZE, ttl=TTL, max_ttl=None, path=None, format="pica", **kwargs):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.max_ttl = max_ttl
+        self.cls = record_class(format)
+        self.kwargs = kwargs
+        self.entries = collections.OrderedDict()
+        self.stats = collections.Counter()
+        self.path = path
+        self.db = None
+        self.uncommitted = 0
+        if path is not None:
+            self.db = sqlite3.connect(path)
+            self.db.execute("CREATE TABLE IF NOT EXISTS records "
+                            "(ppn TEXT PRIMARY KEY, stamp TEXT, expires REAL, data BLOB)")
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, ppn):
+        entry = self.entries.get(ppn)
+        return entry is not None and entry.expires > time.time()
+
+    def record_ttl(self, record):
+        """
+        Time to live of given record in seconds
+        """
+        if self.max_ttl is None:
+            return self.ttl
+        changed = change_datetime(record)
+        if changed is None:
+            return self.ttl
+        age = time.time() - time.mktime(changed.timetuple())
+        return min(self.max_ttl, max(self.ttl, age * STAMP_FACTOR))
+
+    def get(self, ppn):
+        """
+        Get cached record with given PPN, None if not cached or expired
+        """
+        entry = self.entries.get(ppn)
+        if entry is not None:
+            if entry.expires > time.time():
+                self.entries.move_to_end(ppn)
+                self.stats["hits"] += 1
+                return entry.record
+            del self.entries[ppn]
+            self.stats["expired"] += 1
+        if self.db is not None:
+            record = self._get_stored(ppn)
+            if record is not None:
+                return record
+        self.stats["misses"] += 1
+
+    def _get_stored(self, ppn):
+        row = self.db.execute("SELECT stamp, expires, data FROM records WHERE ppn = ?", (ppn,)).fetchone()
+        if row is not None:
+            stamp, expires, data = row
+            if expires > time.time():
+                record = self.cls(loads(data), **self.kwargs)
+                self._set(ppn, Entry(expires, stamp, record))
+                self.stats["disk_hits"] += 1
+                return record
+            self._delete_stored(ppn)
+            self.stats["expired"] += 1
+
+    def put(self, record, ppn=None):
+        """
+        Cache given record (by its PPN)
+        """
+        if ppn is None:
+            ppn = record.get_ppn()
+            if ppn is None:
+                raise ValueError("Cannot cache record without PPN")
+        stamp = record_stamp(record)
+        expires = time.time() + self.record_ttl(record)
+        self._set(ppn, Entry(expires, stamp, record))
+        if self.db is not None:
+            self.db.execute("INSERT OR REPLACE INTO records VALUES (?, ?, ?, ?)",
+                            (ppn, stamp, expires, dumps(_record_data(record))))
+            self._changed()
+
+    def _set(self, ppn, entry):
+        self.entries[ppn] = entry
+        self.entries.move_to_end(ppn)
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    def load(self, ppn, loader):
+        """
+        Get record with given PPN from cache or load it by calling loader
+        with the PPN (e.g. IndexedDump.get) and cache it
+        """
+        record = self.get(ppn)
+        if record is None:
+            record = loader(ppn)
+            if record is not None:
+                self.put(record, ppn=ppn)
+        return record
+
+    def invalidate(self, ppn, stamp=None):
+        """
+        Remove record with given PPN from cache, with a stamp only if
+        its cached latest change stamp differs
+        """
+        entry = self.entries.get(ppn)
+        if entry is not None and (stamp is None or entry.stamp != stamp):
+            del self.entries[ppn]
+            self.stats["invalidations"] += 1
+        if self.db is not None:
+            if stamp is None:
+                self._delete_stored(ppn)
+            else:
+                self.db.execute("DELETE FROM records WHERE ppn = ? AND stamp IS NOT ?", (ppn, stamp))
+                self._changed()
+
+    def _delete_stored(self, ppn):
+        self.db.execute("DELETE FROM records WHERE ppn = ?", (ppn,))
+        self._changed()
+
+    def _changed(self):
+        self.uncommitted += 1
+        if self.uncommitted >= COMMIT_INTERVAL:
+            self.commit()
+
+    def commit(self):
+        """
+        Commit changes to database
+        """
+        if self.db is not None and self.uncommitted > 0:
+            self.db.commit()
+            self.uncommitted = 0
+
+    def clear(self):
+        """
+        Remove all records from cache (and database)
+        """
+        self.entries.clear()
+        if self.db is not None:
+            self.db.execute("DELETE FROM records")
+            self.db.commit()
+            self.uncommitted = 0
+
+    def metrics(self):
+        """
+        Counts of hits, misses, expirations and evictions, hit ratio and size
+        """
+        metrics = {name: self.stats[name] for name in ("hits", "disk_hits", "misses", "expired", "evictions", "invalidations")}
+        lookups = metrics["hits"] + metrics["disk_hits"] + metrics["misses"]
+        metrics["hit_ratio"] = (metrics["hits"] + metrics["disk_hits"]) / lookups if lookups > 0 else 0.0
+        metrics["size"] = len(self.entries)
+        return metrics
+
+    def close(self):
+        """
+        Commit changes and close database
+        """
+        if self.db is not None:
+            self.commit()
+            self.db.close()
+            self.db = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,210 @@
+import time
+import asyncio
+import logging
+
+from .stream import record_class
+from .utils import loads, set_stream
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+
+logger = logging.getLogger(__name__)
+set_stream(logger)
+
+UNAPI_URL = "https://unapi.k10plus.de/"
+
+UNAPI_FORMATS = {
+    "pica": "picajson",
+    "picajson": "picajson",
+    "marc": "marcjson",
+    "marcjson": "marcjson",
+}
+
+RETRY_STATUS = (429, 500, 502, 503, 504)
+
+
+class RateLimiter:
+    """
+    Limit the number of requests started per second
+    """
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate
+        self.next_start = 0.0
+        self.lock = asyncio.Lock()
+
+    async def wait(self):
+        async with self.lock:
+            now = time.monotonic()
+            if self.next_start > now:
+                await asyncio.sleep(self.next_start - now)
+                now = self.next_start
+            self.next_start = now + self.interval
+
+
+class UnapiClient:
+    """
+    Asynchronous client fetching records from an unAPI endpoint
+
+    All requests share one session with a pool of keep-alive connections,
+    at most concurrency requests are running at the same time. Failed
+    requests (connection errors, timeouts, status 429 and 5xx) are retried
+    with exponential backoff. With rate set, at most rate requests are
+    started per second. Records not found are logged and skipped, records
+    failing otherwise are logged, skipped by fetch_many and kept with their
+    errors in failures. With a RecordCache, cached records are returned
+    without a request and fetched records are cached.
+    """
+
+    def __init__(self, format="picajson", url=UNAPI_URL, database="swb", concurrency=10,
+                 retries=3, backoff=0.5, rate=None, timeout=30, cache=None, **kwargs):
+        if aiohttp is None:
+            raise ImportError("Fetching records requires aiohttp")
+        try:
+            self.unapi_format = UNAPI_FORMATS[format.lower()]
+        except (AttributeError, KeyError):
+            raise ValueError("Unknown record format {0}. Expected one of: {1}".format(format, ", ".join(UNAPI_FORMATS)))
+        self.cls = record_class(self.unapi_format)
+        self.url = url
+        self.database = database
+        self.concurrency = concurrency
+        self.retries = retries
+        self.backoff = backoff
+        self.limiter = RateLimiter(rate) if rate else None
+        self.timeout = timeout
+        self.cache = cache
+        self.kwargs = kwargs
+        self.session = None
+        self.semaphore = None
+        self.failures = {}
+
+    async def open(self):
+        """
+        Open session with connection pool
+        """
+        if self.session is None:
+            connector = aiohttp.TCPConnector(limit=self.concurrency)
+            self.session = aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=self.timeout))
+            self.semaphore = asyncio.Semaphore(self.concurrency)
+
+    async def close(self):
+        """
+        Close session and its connections
+        """
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    async def __aenter__(self):
+        await self.open()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    def _params(self, ppn):
+        return {"format": self.unapi_format, "id": "{0}:ppn:{1}".format(self.database, ppn)}
+
+    async def fetch_raw(self, ppn):
+        """
+        Fetch JSON of record with given PPN, None if not found
+
+        Raises IOError if the request fails with a status other than 404
+        or still fails after all retries.
+        """
+        await self.open()
+        attempt = 0
+        while True:
+            if self.limiter is not None:
+                await self.limiter.wait()
+            try:
+                async with self.semaphore:
+                    async with self.session.get(self.url, params=self._params(ppn)) as response:
+                        if response.status == 404:
+                            logger.warning("Record {0} not found".format(ppn))
+                            return None
+                        if response.status in RETRY_STATUS:
+                            error = "HTTP status {0}".format(response.status)
+                        elif response.status >= 400:
+                            raise IOError("Failed to fetch record {0}: HTTP status {1}".format(ppn, response.status))
+                        else:
+                            body = await response.read()
+                            if not body.strip():
+                                logger.warning("Record {0} not found".format(ppn))
+                                return None
+                            return loads(body)
+            except (aiohttp.ClientConnectionError, aiohttp.ClientPayloadError, asyncio.TimeoutError) as err:
+                error = err.__class__.__name__ if not str(err) else str(err)
+            if attempt >= self.retries:
+                raise IOError("Failed to fetch record {0}: {1}".format(ppn, error))
+            delay = self.backoff * 2 ** attempt
+            attempt += 1
+            logger.debug("Retrying record {0} in {1:.1f}s after error: {2}".format(ppn, delay, error))
+            await asyncio.sleep(delay)
+
+    async def fetch(self, ppn):
+        """
+        Fetch record with given PPN, None if not found
+        """
+        if self.cache is not None:
+            record = self.cache.get(ppn)
+            if record is not None:
+                return record
+        data = await self.fetch_raw(ppn)
+        if data is not None:
+            record = self.cls(data, **self.kwargs)
+            if self.cache is not None:
+                self.cache.put(record, ppn=ppn)
+            return record
+
+    async def fetch_many(self, ppns):
+        """
+        Yield records with given PPNs as their requests complete
+
+        At most twice as many requests as the concurrency limit are
+        scheduled at a time, so PPNs can be an iterator of any length.
+        Records which cannot be fetched or parsed are skipped, their PPNs
+        and errors are kept in failures.
+        """
+        await self.open()
+        ppns = iter(ppns)
+        pending = {}
+        window = self.concurrency * 2
+        exhausted = False
+        try:
+            while True:
+                while not exhausted and len(pending) < window:
+                    try:
+                        ppn = next(ppns)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    pending[asyncio.ensure_future(self.fetch(ppn))] = ppn
+                if len(pending) == 0:
+                    break
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    ppn = pending.pop(task)
+                    try:
+                        record = task.result()
+                    except (IOError, ValueError, aiohttp.ClientError) as err:
+                        logger.error("Skipping record {0}: {1}".format(ppn, err))
+                        self.failures[ppn] = err
+                        continue
+                    if record is not None:
+                        yield record
+        finally:
+            for task in pending:
+                task.cancel()
+
+
+async def fetch_records(ppns, format="picajson", **kwargs):
+    """
+    Yield records with given PPNs fetched from unAPI as they complete
+    """
+    async with UnapiClient(format=format, **kwargs) as client:
+        async for record in client.fetch_many(ppns):
+            yield record
@@ -0,0 +1,136 @@
+from .marcjson import MarcJson
+from .stream import record_class, stream_records
+
+
+PICA_INDEXES = {
+    "epn": ("203@", "0"),
+    "iln": ("101@", "a"),
+    "isil": ("209A", "B"),
+    "rvk": ("045R", "a"),
+}
+
+MARC_INDEXES = {
+    "epn": ("924", "a"),
+    "isil": ("924", "b"),
+}
+
+
+class RecordCollection:
+    """
+    Collection of records keyed by PPN with inverted indexes
+
+    Each index maps the values of a (field, subfield) pair to the PPNs of
+    the records containing them, e.g. {"isil": ("209A", "B")}. Without
+    indexes, the default indexes of the given format are built. Records
+    can be added and removed at any time, indexes are updated in place.
+    """
+
+    def __init__(self, records=None, indexes=None, format="pica"):
+        if indexes is None:
+            if record_class(format) is MarcJson:
+                indexes = MARC_INDEXES
+            else:
+                indexes = PICA_INDEXES
+        self.indexes = dict(indexes)
+        self.records = {}
+        self.postings = {name: {} for name in self.indexes}
+        if records is not None:
+            self.add_many(records)
+
+    @classmethod
+    def from_path(cls, path, indexes=None, format="pica", **kwargs):
+        """
+        Create collection from records of (compressed) NDJSON file at given path
+        """
+        return cls(stream_records(path, format=format, **kwargs), indexes=indexes, format=format)
+
+    def __len__(self):
+        return len(self.records)
+
+    def __contains__(self, ppn):
+        return ppn in self.records
+
+    def __iter__(self):
+        return iter(self.records.values())
+
+    def add(self, record):
+        """
+        Add record to collection, replacing a record with the same PPN
+        """
+        ppn = record.get_ppn()
+        if ppn is None:
+            raise ValueError("Cannot add record without PPN to collection")
+        if ppn in self.records:
+            self.remove(ppn)
+        self.records[ppn] = record
+        for name, (field, subfield) in self.indexes.items():
+            postings = self.postings[name]
+            for value in set(record._subfield_values(field, subfield)):
+                if value in postings:
+                    postings[value].add(ppn)
+                else:
+                    postings[value] = {ppn}
+
+    def add_many(self, records):
+        """
+        Add each of given records to collection
+        """
+        for record in records:
+            self.add(record)
+
+    def remove(self, ppn):
+        """
+        Remove record with given PPN from collection and return it
+        """
+        record = self.records.pop(ppn, None)
+        if record is not None:
+            for name, (field, subfield) in self.indexes.items():
+                postings = self.postings[name]
+                for value in set(record._subfield_values(field, subfield)):
+                    ppns = postings.get(value)
+                    if ppns is not None:
+                        ppns.discard(ppn)
+                        if len(ppns) == 0:
+                            del postings[value]
+        return record
+
+    def get(self, ppn):
+        """
+        Get record with given PPN
+        """
+        return self.records.get(ppn)
+
+    def lookup(self, name, value):
+        """
+        Get PPNs of records with given value in index with given name
+        """
+        if name not in self.postings:
+            raise KeyError("Unknown index {0}".format(name))
+        return set(self.postings[name].get(value, ()))
+
+    def find(self, **criteria):
+        """
+        Get PPNs of records matching all given index values,
+        e.g. find(isil="DE-14", rvk="ST 250")
+        """
+        postings = []
+        for name, value in criteria.items():
+            if name not in self.postings:
+                raise KeyError("Unknown index {0}".format(name))
+            postings.append(self.postings[name].get(value, set()))
+        if len(postings) == 0:
+            return set(self.records)
+        postings.sort(key=len)
+        return postings[0].intersection(*postings[1:])
+
+    def find_records(self, **criteria):
+        """
+        Get records matching all given index values
+        """
+        return [self.records[ppn] for ppn in self.find(**criteria)]
+
+    def values(self, name):
+        """
+        Get indexed values of index with given name and their number of records
+        """
+        return {value: len(ppns) for value, ppns in self.postings[name].items()}
@@ -0,0 +1,102 @@
+import sys
+import array
+
+from .marcjson import MarcJson
+from .picajson import PicaJson
+
+
+class CompactData:
+    """
+    Read-only sequence of field rows stored in a flat value table
+
+    Tags, occurrences/indicators and subfield codes are interned, values of
+    all rows are kept in one list and rows are delimited by an offset array.
+    Rows are materialized as (new) lists on access.
+    """
+
+    __slots__ = ("values", "offsets")
+
+    def __init__(self, data, skip=1):
+        values = []
+        offsets = array.array("I", [0])
+        intern = sys.intern
+        for row in data:
+            for i, value in enumerate(row):
+                if isinstance(value, str) and (i < skip or (i - skip) % 2 == 0):
+                    value = intern(value)
+                values.append(value)
+            offsets.append(len(values))
+        self.values = values
+        self.offsets = offsets
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self)
+        if i < 0 or i >= len(self):
+            raise IndexError("row index out of range")
+        return self.values[self.offsets[i]:self.offsets[i + 1]]
+
+    def __iter__(self):
+        values = self.values
+        offsets = self.offsets
+        for i in range(len(offsets) - 1):
+            yield values[offsets[i]:offsets[i + 1]]
+
+    def tags(self):
+        """
+        Tags of all rows without materializing the rows
+        """
+        values = self.values
+        return [values[offset] for offset in self.offsets[:-1]]
+
+    def tolist(self):
+        """
+        Rows as nested lists
+        """
+        return list(self)
+
+
+class CompactRecord:
+    """
+    Mixin for records backed by CompactData
+    """
+
+    __slots__ = ()
+
+    def __init__(self, data, **kwargs):
+        if data is not None and not isinstance(data, CompactData):
+            data = CompactData(data, skip=self.SKIP)
+        super().__init__(data, **kwargs)
+
+    def _indices(self):
+        indices = {}
+        if self.data is not None:
+            for i, tag in enumerate(self.data.tags()):
+                if tag in indices:
+                    indices[tag].append(i)
+                else:
+                    indices[tag] = [i]
+        return {tag: array.array("I", positions) for tag, positions in indices.items()}
+
+
+class CompactPicaJson(CompactRecord, PicaJson):
+    """
+    Class for parsing PICA JSON (http://format.gbv.de/pica/json) into a compact representation
+    """
+
+    __slots__ = ()
+
+    SKIP = 2
+
+
+class CompactMarcJson(CompactRecord, MarcJson):
+    """
+    Class for parsing MARC JSON (http://format.gbv.de/marc/json) into a compact representation
+    """
+
+    __slots__ = ()
+
+    SKIP = 3
@@ -0,0 +1,88 @@
+"""
+Fast parsing of the fixed date and time formats used in PICA and MARC records
+
+Values in the expected layout are parsed by slicing at fixed offsets,
+anything else falls back to datetime.strptime with the same format,
+so results and errors (ValueError) match strptime. Parsed values are
+memoized in bounded LRU caches as dates repeat a lot within dumps.
+"""
+
+import datetime
+import functools
+
+
+CACHE_SIZE = 16384
+
+PICA_DATE = "%d-%m-%y"
+PICA_DATETIME = "%d-%m-%y %H:%M:%S.%f"
+MARC_DATE = "%y%m%d"
+MARC_DATETIME = "%Y%m%d%H%M%S.0"
+
+
+def _year(yy):
+    # same pivot as strptime for %y
+    if yy < 69:
+        return 2000 + yy
+    return 1900 + yy
+
+
+def _digits(*parts):
+    for part in parts:
+        if not (part.isascii() and part.isdigit()):
+            return False
+    return True
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def pica_date(value):
+    """
+    Parse PICA date (dd-mm-yy) to date object
+    """
+    if len(value) == 8 and value[2] == "-" and value[5] == "-":
+        d, m, y = value[0:2], value[3:5], value[6:8]
+        if _digits(d, m, y):
+            return datetime.date(_year(int(y)), int(m), int(d))
+    return datetime.datetime.strptime(value, PICA_DATE).date()
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def pica_datetime(value):
+    """
+    Parse PICA timestamp (dd-mm-yy HH:MM:SS.fff) to datetime object
+    """
+    if 19 <= len(value) <= 24 and value[2] == "-" and value[5] == "-" and value[8] == " " \
+            and value[11] == ":" and value[14] == ":" and value[17] == ".":
+        d, m, y = value[0:2], value[3:5], value[6:8]
+        hh, mm, ss, f = value[9:11], value[12:14], value[15:17], value[18:]
+        if _digits(d, m, y, hh, mm, ss, f):
+            return datetime.datetime(_year(int(y)), int(m), int(d), int(hh), int(mm), int(ss), int(f.ljust(6, "0")))
+    return datetime.datetime.strptime(value, PICA_DATETIME)
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def marc_date(value):
+    """
+    Parse MARC date (yymmdd) to date object
+    """
+    if len(value) == 6 and _digits(value):
+        return datetime.date(_year(int(value[0:2])), int(value[2:4]), int(value[4:6]))
+    return datetime.datetime.strptime(value, MARC_DATE).date()
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def marc_datetime(value):
+    """
+    Parse MARC timestamp (yyyymmddHHMMSS.0) to datetime object
+    """
+    if len(value) == 16 and value[14:] == ".0" and _digits(value[:14]):
+        return datetime.datetime(int(value[0:4]), int(value[4:6]), int(value[6:8]),
+                                 int(value[8:10]), int(value[10:12]), int(value[12:14]))
+    return datetime.datetime.strptime(value, MARC_DATETIME)
+
+
+def cache_clear():
+    """
+    Clear memoized values of all parsers
+    """
+    for parser in (pica_date, pica_datetime, marc_date, marc_datetime):
+        parser.cache_clear()
@@ -0,0 +1,230 @@
+import os
+import gzip
+import base64
+import hashlib
+import logging
+import collections
+
+from .picajson import PicaJson
+from .stream import record_class, stream_lines
+from .utils import set_stream
+
+
+logger = logging.getLogger(__name__)
+set_stream(logger)
+
+NEW = "new"
+CHANGED = "changed"
+DELETED = "deleted"
+
+Change = collections.namedtuple("Change", ("action", "ppn", "epn", "stamp", "record"))
+
+State = collections.namedtuple("State", ("stamp", "digest", "holdings"))
+
+# bytes of content and holding hashes kept in the state
+DIGEST_SIZE = 6
+HOLDING_DIGEST_SIZE = 3
+
+
+def _short_hash(raw, size):
+    return base64.urlsafe_b64encode(hashlib.blake2b(raw, digest_size=size).digest()).decode("ascii").rstrip("=")
+
+
+def digest(raw):
+    """
+    Short content hash of raw record
+    """
+    return _short_hash(raw.strip(), DIGEST_SIZE)
+
+
+def record_stamp(record):
+    """
+    Latest change stamp of record (PICA 001B, MARC 005)
+    """
+    if isinstance(record, PicaJson):
+        stamp = record._subfield_values("001B", "0") + record._subfield_values("001B", "t")
+        if len(stamp) > 0:
+            return " ".join(stamp)
+    else:
+        stamp = record._subfield_values("005", "_")
+        if len(stamp) > 0:
+            return stamp[0]
+
+
+def holding_stamps(record):
+    """
+    Latest change stamps of holdings by EPN (PICA 201B, MARC hash of 924)
+    """
+    stamps = {}
+    if isinstance(record, PicaJson):
+        for holding in record.holdings():
+            if holding.epn:
+                stamps[holding.epn] = holding.latest_change_str or ""
+    else:
+        holding_fields = record._field_rows("924")
+        if holding_fields is not None:
+            for holding_field in holding_fields:
+                pos = record._subfield_pos(holding_field, "a")
+                if pos is not None:
+                    raw = "\x1f".join(v or "" for v in holding_field).encode("utf-8")
+                    stamps[holding_field[pos[0]]] = _short_hash(raw, HOLDING_DIGEST_SIZE)
+    return stamps
+
+
+def unchanged_stamps(record, stamp, previous):
+    """
+    Whether the change stamps of record match its previous state
+
+    Only the fields holding change stamps are looked up, PICA 001B, 201B and
+    203@ (title and holding changes do not touch each other's stamps), MARC
+    005 and 924. Without a stamp, the record cannot be compared this way.
+    """
+    if stamp is None or stamp != previous.stamp:
+        return False
+    if not isinstance(record, PicaJson):
+        return holding_stamps(record) == previous.holdings
+    if sorted(record._subfield_values("203@", "0")) != sorted(previous.holdings):
+        return False
+    stamps = []
+    rows = record._field_rows("201B")
+    if rows is not None:
+        for row in rows:
+            date = record._subfield_pos(row, "0")
+            time = record._subfield_pos(row, "t")
+            if date is not None and time is not None:
+                stamps.append("{0} {1}".format(row[date[0]], row[time[0]]))
+    return sorted(stamps) == sorted(s for s in previous.holdings.values() if s)
+
+
+class ChangeState:
+    """
+    Store of PPN → (latest change stamp, content hash, holding stamps)
+
+    The state is kept in memory and saved as gzip compressed TSV. Content
+    and MARC holding hashes are truncated and stored in base64.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.states = {}
+        if os.path.exists(path):
+            self.load()
+
+    def __len__(self):
+        return len(self.states)
+
+    def __contains__(self, ppn):
+        return ppn in self.states
+
+    def get(self, ppn):
+        """
+        Get state of record with given PPN
+        """
+        return self.states.get(ppn)
+
+    def set(self, ppn, state):
+        """
+        Set state of record with given PPN
+        """
+        self.states[ppn] = state
+
+    def remove(self, ppn):
+        """
+        Remove state of record with given PPN and return it
+        """
+        return self.states.pop(ppn, None)
+
+    def load(self):
+        """
+        Load state from file
+        """
+        states = {}
+        with gzip.open(self.path, "rt", encoding="utf-8") as f:
+            for line in f:
+                ppn, stamp, content_digest, holdings = line.rstrip("\n").split("\t")
+                stamps = {}
+                if holdings:
+                    for holding in holdings.split("|"):
+                        epn, _, holding_stamp = holding.partition("=")
+                        stamps[epn] = holding_stamp
+                states[ppn] = State(stamp, content_digest, stamps)
+        self.states = states
+
+    def save(self):
+        """
+        Save state to file (atomically)
+        """
+        tmp = "{0}.tmp".format(self.path)
+        with gzip.open(tmp, "wt", encoding="utf-8") as f:
+            for ppn, state in self.states.items():
+                holdings = "|".join("{0}={1}".format(epn, stamp) for epn, stamp in state.holdings.items())
+                f.write("{0}\t{1}\t{2}\t{3}\n".format(ppn, state.stamp or "", state.digest, holdings))
+        os.replace(tmp, self.path)
+
+
+class DeltaProcessor:
+    """
+    Detect new, changed and deleted records and holdings between dumps
+
+    Records are located by PPN via a lazy scan and compared by their change
+    stamps first, so unchanged records are skipped without parsing or
+    hashing them. Records with missing or differing stamps are compared by
+    a hash of their raw JSON. Only new and changed records are parsed to
+    compare their holdings. With full=True, each processed dump is expected
+    to be complete and records missing from it are reported as deleted.
+    """
+
+    def __init__(self, state_path, format="pica", full=True):
+        self.state = ChangeState(state_path)
+        self.cls = record_class(format, lazy=True)
+        self.full = full
+        self.counts = collections.Counter()
+
+    def process(self, path):
+        """
+        Yield changes of records in (compressed) NDJSON dump at given path
+
+        The state is updated in memory, call save to persist it.
+        """
+        seen = set()
+        for line in stream_lines(path):
+            record = self.cls(line)
+            ppn = record.get_ppn()
+            if ppn is None:
+                logger.warning("Skipping record without PPN in dump {0}".format(path))
+                continue
+            seen.add(ppn)
+            stamp = record_stamp(record)
+            previous = self.state.get(ppn)
+            if previous is not None and unchanged_stamps(record, stamp, previous):
+                self.counts["unchanged"] += 1
+                continue
+            content_digest = digest(line)
+            if previous is not None and previous.digest == content_digest:
+                self.counts["unchanged"] += 1
+                continue
+            holdings = holding_stamps(record)
+            action = NEW if previous is None else CHANGED
+            self.counts[action] += 1
+            yield Change(action, ppn, None, stamp, record)
+            previous_holdings = {} if previous is None else previous.holdings
+            for epn, holding_stamp in holdings.items():
+                if epn not in previous_holdings:
+                    yield Change(NEW, ppn, epn, holding_stamp, record)
+                elif previous_holdings[epn] != holding_stamp:
+                    yield Change(CHANGED, ppn, epn, holding_stamp, record)
+            for epn in previous_holdings:
+                if epn not in holdings:
+                    yield Change(DELETED, ppn, epn, None, record)
+            self.state.set(ppn, State(stamp, content_digest, holdings))
+        if self.full:
+            for ppn in [p for p in self.state.states if p not in seen]:
+                self.counts[DELETED] += 1
+                previous = self.state.remove(ppn)
+                yield Change(DELETED, ppn, None, previous.stamp, None)
+
+    def save(self):
+        """
+        Save state to file
+        """
+        self.state.save()
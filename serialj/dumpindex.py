@@ -0,0 +1,243 @@
+import os
+import mmap
+import struct
+import logging
+
+from .stream import record_class
+from .utils import is_compressed, loads, set_stream
+
+
+logger = logging.getLogger(__name__)
+set_stream(logger)
+
+MAGIC = b"SJIX"
+VERSION = 1
+
+# magic, version, number of sections, length of format name
+HEADER = struct.Struct("<4sHHB")
+# length of section name
+SECTION_NAME = struct.Struct("<B")
+# number of keys, positions of key offsets, key blob and entries
+SECTION = struct.Struct("<QQQQ")
+KEY_OFFSET = struct.Struct("<Q")
+# byte offset and length of record in dump
+ENTRY = struct.Struct("<QI")
+
+PRIMARY = "ppn"
+
+
+def index_path_for(dump_path):
+    """
+    Default path of index file for dump at given path
+    """
+    return "{0}.idx".format(dump_path)
+
+
+def build_index(dump_path, index_path=None, format="pica", keys=None):
+    """
+    Build index of PPNs (and secondary keys) for NDJSON dump at given path
+
+    Secondary keys map names to (field, subfield) pairs, e.g.
+    {"epn": ("203@", "0"), "isil": ("209A", "B")}. Each section of the
+    index stores its keys in sorted order with byte offset and length of
+    the record in the dump, so records can be found by binary search.
+    Returns the number of indexed records.
+    """
+    if is_compressed(dump_path):
+        raise ValueError("Cannot index compressed dump {0}".format(dump_path))
+    if index_path is None:
+        index_path = index_path_for(dump_path)
+    if keys is None:
+        keys = {}
+    cls = record_class(format, lazy=True)
+    sections = {PRIMARY: []}
+    for name in keys:
+        sections[name] = []
+    count = 0
+    offset = 0
+    with open(dump_path, "rb") as f:
+        for line in f:
+            length = len(line.rstrip(b"\r\n"))
+            if line.strip():
+                record = cls(line)
+                ppn = record.get_ppn()
+                if ppn is None:
+                    logger.warning("Skipping record without PPN at offset {0} of dump {1}".format(offset, dump_path))
+                else:
+                    sections[PRIMARY].append((ppn.encode("utf-8"), offset, length))
+                    for name, (field, subfield) in keys.items():
+                        for value in set(record._subfield_values(field, subfield)):
+                            sections[name].append((value.encode("utf-8"), offset, length))
+                    count += 1
+            offset += len(line)
+    _write_index(index_path, format, sections)
+    return count
+
+
+def _write_index(path, format, sections):
+    format_name = format.encode("utf-8")
+    header_size = HEADER.size + len(format_name)
+    for name in sections:
+        header_size += SECTION_NAME.size + len(name.encode("utf-8")) + SECTION.size
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(sections), len(format_name)))
+        f.write(format_name)
+        position = header_size
+        layout = []
+        for name, entries in sections.items():
+            entries.sort(key=lambda e: e[0])
+            blob_size = sum(len(e[0]) for e in entries)
+            key_offsets_pos = position
+            key_blob_pos = key_offsets_pos + KEY_OFFSET.size * (len(entries) + 1)
+            entries_pos = key_blob_pos + blob_size
+            position = entries_pos + ENTRY.size * len(entries)
+            layout.append((name, entries))
+            name = name.encode("utf-8")
+            f.write(SECTION_NAME.pack(len(name)))
+            f.write(name)
+            f.write(SECTION.pack(len(entries), key_offsets_pos, key_blob_pos, entries_pos))
+        for name, entries in layout:
+            key_offset = 0
+            f.write(KEY_OFFSET.pack(key_offset))
+            for key, _, _ in entries:
+                key_offset += len(key)
+                f.write(KEY_OFFSET.pack(key_offset))
+            for key, _, _ in entries:
+                f.write(key)
+            for _, offset, length in entries:
+                f.write(ENTRY.pack(offset, length))
+
+
+class _Section:
+    """
+    Sorted keys and record entries of one index section in a memory map
+    """
+
+    def __init__(self, mm, count, key_offsets_pos, key_blob_pos, entries_pos):
+        self.mm = mm
+        self.count = count
+        self.key_offsets_pos = key_offsets_pos
+        self.key_blob_pos = key_blob_pos
+        self.entries_pos = entries_pos
+
+    def key(self, i):
+        start, = KEY_OFFSET.unpack_from(self.mm, self.key_offsets_pos + i * KEY_OFFSET.size)
+        end, = KEY_OFFSET.unpack_from(self.mm, self.key_offsets_pos + (i + 1) * KEY_OFFSET.size)
+        return self.mm[self.key_blob_pos + start:self.key_blob_pos + end]
+
+    def entry(self, i):
+        return ENTRY.unpack_from(self.mm, self.entries_pos + i * ENTRY.size)
+
+    def find(self, key):
+        """
+        Byte offsets and lengths of records with given key (binary search)
+        """
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.key(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        found = []
+        while lo < self.count and self.key(lo) == key:
+            found.append(self.entry(lo))
+            lo += 1
+        return found
+
+
+class IndexedDump:
+    """
+    Random access to records of NDJSON dump via index built with build_index
+
+    Dump and index are memory-mapped, records are decoded on demand.
+    """
+
+    def __init__(self, dump_path, index_path=None, **kwargs):
+        if index_path is None:
+            index_path = index_path_for(dump_path)
+        self.kwargs = kwargs
+        self._files = []
+        self._maps = []
+        try:
+            self._open(dump_path, index_path)
+        except Exception:
+            self.close()
+            raise
+
+    def _open(self, dump_path, index_path):
+        self.dump = self._map(dump_path)
+        self.index = self._map(index_path)
+        if len(self.index) < HEADER.size:
+            raise ValueError("Invalid index file {0}".format(index_path))
+        magic, version, nsections, format_len = HEADER.unpack_from(self.index, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("Invalid index file {0}".format(index_path))
+        position = HEADER.size
+        self.format = self.index[position:position + format_len].decode("utf-8")
+        position += format_len
+        self.cls = record_class(self.format)
+        self.sections = {}
+        for _ in range(nsections):
+            name_len, = SECTION_NAME.unpack_from(self.index, position)
+            position += SECTION_NAME.size
+            name = self.index[position:position + name_len].decode("utf-8")
+            position += name_len
+            self.sections[name] = _Section(self.index, *SECTION.unpack_from(self.index, position))
+            position += SECTION.size
+
+    def _map(self, path):
+        f = open(path, "rb")
+        self._files.append(f)
+        # empty files cannot be memory-mapped
+        if os.fstat(f.fileno()).st_size == 0:
+            return b""
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._maps.append(mm)
+        return mm
+
+    def __len__(self):
+        return self.sections[PRIMARY].count
+
+    def __contains__(self, ppn):
+        return len(self.sections[PRIMARY].find(ppn.encode("utf-8"))) > 0
+
+    def _record(self, offset, length):
+        return self.cls(loads(self.dump[offset:offset + length]), **self.kwargs)
+
+    def offsets(self, name, key):
+        """
+        Byte offsets and lengths of records with given key in index with given name
+        """
+        if name not in self.sections:
+            raise KeyError("Unknown index {0}".format(name))
+        return self.sections[name].find(key.encode("utf-8"))
+
+    def get(self, ppn):
+        """
+        Get record with given PPN
+        """
+        found = self.offsets(PRIMARY, ppn)
+        if len(found) > 0:
+            return self._record(*found[0])
+
+    def lookup(self, name, key):
+        """
+        Get records with given key in index with given name
+        """
+        return [self._record(offset, length) for offset, length in self.offsets(name, key)]
+
+    def close(self):
+        """
+        Close memory maps and files of dump and index
+        """
+        for mm in self._maps:
+            mm.close()
+        for f in self._files:
+            f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
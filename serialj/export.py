@@ -0,0 +1,254 @@
+import csv
+import datetime
+
+from .extractor import compile_getters
+from .marcjson import MarcJson
+from .picajson import PicaJson, HOLDING_FIELDS
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+
+BATCH_SIZE = 10000
+# batches held back at most while types of Parquet columns are unknown
+MAX_PENDING = 10
+
+PICA_HOLDING_COLUMNS = ("ppn",) + HOLDING_FIELDS
+MARC_HOLDING_COLUMNS = ("ppn", "indicator1", "indicator2", "epn", "isil", "status", "signature")
+MARC_HOLDING_SUBFIELDS = (("epn", "a"), ("isil", "b"), ("status", "d"), ("signature", "g"))
+
+
+def holding_rows(record):
+    """
+    Yield holdings of record as column tuples (see PICA_HOLDING_COLUMNS
+    and MARC_HOLDING_COLUMNS), keyed by the PPN of the record
+    """
+    ppn = record.get_ppn()
+    if isinstance(record, PicaJson):
+        for holding in record.holdings():
+            yield (ppn,) + tuple(holding)
+    elif isinstance(record, MarcJson):
+        holding_fields = record.get_field("924")
+        if holding_fields is not None:
+            for holding_field in holding_fields:
+                values = [ppn, holding_field[1], holding_field[2]]
+                for _, subfield in MARC_HOLDING_SUBFIELDS:
+                    values.append(record._value_from_rows([holding_field], subfield, collapse=True))
+                yield tuple(values)
+
+
+def _csv_value(value):
+    if value is None:
+        return ""
+    if isinstance(value, (list, tuple)):
+        return "|".join(_csv_value(v) for v in value)
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    return str(value)
+
+
+def _unresolved(column_type):
+    # type inferred from None values or empty lists only
+    return pyarrow.types.is_null(column_type) or \
+        (pyarrow.types.is_list(column_type) and pyarrow.types.is_null(column_type.value_type))
+
+
+class _TableWriter:
+    """
+    Write batches of columns to Parquet (row groups) or CSV
+
+    Types of Parquet columns not given in schema are inferred from their
+    first non-null values. Batches are held back until the types of all
+    columns are known, but at most MAX_PENDING batches, columns without
+    any values by then are written as strings.
+    """
+
+    def __init__(self, path, columns, format, schema=None):
+        self.path = path
+        self.columns = list(columns)
+        self.format = format
+        self.writer = None
+        self.file = None
+        self.types = {}
+        self.pending = []
+        if schema is not None:
+            for name in self.columns:
+                if isinstance(schema, dict):
+                    if name in schema:
+                        self.types[name] = schema[name]
+                elif schema.get_field_index(name) != -1:
+                    self.types[name] = schema.field(name).type
+
+    def write(self, buffers):
+        if self.format == "parquet":
+            self._write_parquet(buffers)
+        else:
+            self._write_csv(buffers)
+
+    def _write_parquet(self, buffers):
+        if self.writer is not None:
+            self._write_table(buffers)
+            return
+        self._infer(buffers)
+        self.pending.append(buffers)
+        if len(self.types) == len(self.columns) or len(self.pending) >= MAX_PENDING:
+            self._write_pending()
+
+    def _infer(self, buffers):
+        for name in self.columns:
+            if name not in self.types:
+                values = [value for value in buffers[name] if value is not None]
+                if len(values) > 0:
+                    column_type = pyarrow.array(values).type
+                    if not _unresolved(column_type):
+                        self.types[name] = column_type
+
+    def _write_pending(self):
+        for name in self.columns:
+            if name not in self.types:
+                self.types[name] = pyarrow.string()
+        pending = self.pending
+        self.pending = []
+        for buffers in pending:
+            self._write_table(buffers)
+
+    def _write_table(self, buffers):
+        arrays = []
+        for name in self.columns:
+            try:
+                arrays.append(pyarrow.array(buffers[name], type=self.types[name]))
+            except (pyarrow.ArrowInvalid, pyarrow.ArrowTypeError) as err:
+                raise ValueError("Cannot write values of column {0} as {1}: {2}. Pass the type of the column in schema.".format(name, self.types[name], err))
+        table = pyarrow.Table.from_arrays(arrays, names=self.columns)
+        if self.writer is None:
+            self.writer = pyarrow.parquet.ParquetWriter(self.path, table.schema)
+        self.writer.write_table(table)
+
+    def _write_csv(self, buffers):
+        if self.writer is None:
+            self.file = open(self.path, "w", newline="", encoding="utf-8")
+            self.writer = csv.writer(self.file)
+            self.writer.writerow(self.columns)
+        columns = [[_csv_value(v) for v in buffers[name]] for name in self.columns]
+        self.writer.writerows(zip(*columns))
+
+    def close(self):
+        if self.format == "parquet":
+            if len(self.pending) > 0:
+                self._write_pending()
+            if self.writer is not None:
+                self.writer.close()
+        elif self.file is not None:
+            self.file.close()
+
+
+class ColumnExporter:
+    """
+    Export getter values of records to Parquet or CSV in batches
+
+    Values are buffered per column and flushed as one row group (Parquet)
+    or block of lines (CSV) every batch_size records, so memory use is
+    bounded by the batch size. Holdings can be exported to a child table
+    with one row per holding, keyed by PPN and EPN.
+
+    Types of Parquet columns can be given as schema, either as pyarrow
+    schema or as dictionary of column names and pyarrow types, otherwise
+    they are inferred from the first non-null values of the columns.
+    """
+
+    def __init__(self, path, columns, holdings=None, format=None, batch_size=BATCH_SIZE, schema=None):
+        if format is None:
+            format = "parquet" if str(path).endswith(".parquet") else "csv"
+        if format not in ("parquet", "csv"):
+            raise ValueError("Unknown export format {0}. Expected parquet or csv.".format(format))
+        if format == "parquet" and pyarrow is None:
+            raise ImportError("Parquet export requires pyarrow")
+        self.format = format
+        self.batch_size = batch_size
+        self.getters = compile_getters(columns)
+        self.names = [name for name, _, _ in self.getters]
+        self.table = _TableWriter(path, self.names, format, schema=schema)
+        self.buffers = {name: [] for name in self.names}
+        self.buffered = 0
+        self.count = 0
+        self.holdings_path = holdings
+        self.holdings = None
+        self.holding_buffers = None
+        self.holding_columns = None
+
+    def write(self, record):
+        """
+        Add getter values and holdings of given record
+        """
+        for name, getter, kwargs in self.getters:
+            self.buffers[name].append(getattr(record, getter)(**kwargs))
+        self.count += 1
+        self.buffered += 1
+        if self.holdings_path is not None:
+            self._add_holdings(record)
+        if self.buffered >= self.batch_size:
+            self.flush()
+
+    def write_many(self, records):
+        """
+        Add getter values and holdings of each of given records
+        """
+        for record in records:
+            self.write(record)
+        return self.count
+
+    def _add_holdings(self, record):
+        if self.holding_columns is None:
+            if isinstance(record, PicaJson):
+                self.holding_columns = PICA_HOLDING_COLUMNS
+            else:
+                self.holding_columns = MARC_HOLDING_COLUMNS
+            self.holding_buffers = {name: [] for name in self.holding_columns}
+            schema = None
+            if self.format == "parquet":
+                # all values of holdings are strings
+                schema = {name: pyarrow.string() for name in self.holding_columns}
+            self.holdings = _TableWriter(self.holdings_path, self.holding_columns, self.format, schema=schema)
+        for row in holding_rows(record):
+            for name, value in zip(self.holding_columns, row):
+                self.holding_buffers[name].append(value)
+
+    def flush(self):
+        """
+        Write buffered values
+        """
+        if self.buffered > 0:
+            self.table.write(self.buffers)
+            self.buffers = {name: [] for name in self.names}
+            self.buffered = 0
+        if self.holding_buffers is not None and len(self.holding_buffers["ppn"]) > 0:
+            self.holdings.write(self.holding_buffers)
+            self.holding_buffers = {name: [] for name in self.holding_columns}
+
+    def close(self):
+        """
+        Write buffered values and close output files
+        """
+        self.flush()
+        self.table.close()
+        if self.holdings is not None:
+            self.holdings.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def export(records, path, columns, holdings=None, format=None, batch_size=BATCH_SIZE, schema=None):
+    """
+    Export getter values (and holdings) of records to Parquet or CSV
+
+    Returns the number of exported records.
+    """
+    with ColumnExporter(path, columns, holdings=holdings, format=format, batch_size=batch_size, schema=schema) as exporter:
+        return exporter.write_many(records)
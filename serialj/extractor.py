@@ -0,0 +1,116 @@
+CONSTRAINTS = {
+    "occurrence": 1,
+    "indicator1": 1,
+    "indicator2": 2,
+}
+
+OPTIONS = ("unique", "repeat", "collapse")
+
+
+def compile_getters(fields, cls=None):
+    """
+    Resolve getter specification to (name, getter, kwargs) triples
+
+    Each value of fields is either the name of a getter method,
+    e.g. "get_ppn", or a pair of getter name and keyword arguments,
+    e.g. ("get_rvk", {"collapse": True}). If a record class is given,
+    the getters are checked to exist.
+    """
+    compiled = []
+    for name, spec in fields.items():
+        if isinstance(spec, str):
+            getter, kwargs = spec, {}
+        else:
+            getter, kwargs = spec
+        if cls is not None and not callable(getattr(cls, getter, None)):
+            raise ValueError("Unknown getter {0} for field {1} of class {2}".format(getter, name, cls.__name__))
+        compiled.append((name, getter, dict(kwargs)))
+    return compiled
+
+
+class Extractor:
+    """
+    Extract many values from PicaJson or MarcJson records at once
+
+    The specification maps output names to (field, subfield) pairs with an
+    optional dictionary of get_value options, e.g.
+
+        {"ppn": ("003@", "0", {"unique": True}), "rvk": ("045R", "a")}
+
+    Supported options are occurrence (PICA), indicator1 and indicator2 (MARC)
+    as well as unique, repeat and collapse. The specification is compiled
+    once into a plan grouped by field, so every requested field is looked up
+    only once per record, no matter how many values are taken from it.
+    """
+
+    def __init__(self, spec):
+        self.spec = spec
+        self.names = list(spec)
+        self.plan = self._compile(spec)
+
+    @staticmethod
+    def _compile(spec):
+        plan = {}
+        for name, item in spec.items():
+            if len(item) == 2:
+                field, subfield = item
+                options = {}
+            elif len(item) == 3:
+                field, subfield, options = item
+            else:
+                raise ValueError("Invalid specification {0!r} for {1}".format(item, name))
+            unknown = [o for o in options if o not in CONSTRAINTS and o not in OPTIONS]
+            if len(unknown) > 0:
+                raise ValueError("Unknown options {0} for {1}".format(", ".join(unknown), name))
+            constraints = tuple((CONSTRAINTS[o], v) for o, v in options.items() if o in CONSTRAINTS and v is not None)
+            step = (name, subfield, constraints,
+                    options.get("unique", False),
+                    options.get("repeat", True),
+                    options.get("collapse", False))
+            if field in plan:
+                plan[field].append(step)
+            else:
+                plan[field] = [step]
+        return plan
+
+    @staticmethod
+    def _match(row, constraints):
+        for pos, value in constraints:
+            if row[pos] is not None and \
+                    row[pos].strip() != "" and \
+                    row[pos] != value:
+                return False
+        return True
+
+    def extract(self, record):
+        """
+        Extract all values of the specification from given record
+        """
+        result = dict.fromkeys(self.names)
+        for field, steps in self.plan.items():
+            rows = record._field_rows(field)
+            if rows is None:
+                continue
+            for name, subfield, constraints, unique, repeat, collapse in steps:
+                if len(constraints) > 0:
+                    found = [row for row in rows if self._match(row, constraints)]
+                else:
+                    found = rows
+                if unique:
+                    found = record._unique_field(field, found)
+                elif len(found) == 0:
+                    found = None
+                if found is None:
+                    continue
+                if unique and type(found[0]) != list:
+                    result[name] = record._value_from_row(found, subfield, repeat=repeat)
+                else:
+                    result[name] = record._value_from_rows(found, subfield, repeat=repeat, collapse=collapse, preserve=True)
+        return result
+
+    def extract_many(self, records):
+        """
+        Extract all values of the specification from each of given records
+        """
+        for record in records:
+            yield self.extract(record)
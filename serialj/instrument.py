@@ -0,0 +1,183 @@
+"""
+Opt-in instrumentation of record classes
+
+When enabled, the methods of the record classes (constructors, getters
+and internal hot paths like _indices, _subfield_pos and _report) and the
+date parsers are replaced by wrappers counting calls and cumulative time.
+When disabled, the original methods are restored, so there is no overhead
+at all outside of instrumented runs. Times are cumulative, i.e. include
+the time spent in instrumented methods called by a method.
+
+    from serialj import instrument
+    with instrument.instrumented():
+        for record in serialj.stream_records("dump.ndjson"):
+            record.get_holdings_isil()
+    print(instrument.prometheus())
+"""
+
+import re
+import time
+import inspect
+import functools
+import contextlib
+
+from . import dateparse
+
+
+DATE_PARSERS = ("pica_date", "pica_datetime", "marc_date", "marc_datetime")
+
+_stats = {}
+_originals = []
+# number of enable calls not yet matched by disable
+_depth = 0
+
+
+def _classes():
+    from .binary import PackedRecord
+    from .compact import CompactRecord
+    from .lazy import LazyRecord
+    from .marcjson import MarcJson
+    from .parser import Parser
+    from .picajson import PicaJson
+    from .serialj import SerialJson
+    return (Parser, SerialJson, PicaJson, MarcJson, LazyRecord, CompactRecord, PackedRecord)
+
+
+def _wrap(name, func):
+    stats = _stats
+    perf_counter = time.perf_counter
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        start = perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            elapsed = perf_counter() - start
+            entry = stats.get(name)
+            if entry is None:
+                stats[name] = [1, elapsed]
+            else:
+                entry[0] += 1
+                entry[1] += elapsed
+    for attr in ("cache_clear", "cache_info"):
+        if hasattr(func, attr):
+            setattr(wrapper, attr, getattr(func, attr))
+    return wrapper
+
+
+def _methods(cls, pattern):
+    for name, value in list(vars(cls).items()):
+        if not inspect.isfunction(value) or inspect.isgeneratorfunction(value):
+            continue
+        if name.startswith("__") and name != "__init__":
+            continue
+        if pattern is not None and not pattern.search(name):
+            continue
+        yield name, value
+
+
+def enable(classes=None, pattern=None, dates=True):
+    """
+    Instrument methods of given classes (by default all record classes)
+
+    Only methods defined by the classes themselves are wrapped, optionally
+    only those with names matching the regular expression pattern. With
+    dates=True, the date parsers of serialj.dateparse are instrumented too.
+    Calls are reference-counted: if instrumentation is already enabled,
+    the methods stay wrapped as they are until disable has been called
+    as often as enable.
+    """
+    global _depth
+    if _depth > 0:
+        _depth += 1
+        return
+    if classes is None:
+        classes = _classes()
+    if pattern is not None:
+        pattern = re.compile(pattern)
+    _depth = 1
+    for cls in classes:
+        for name, func in _methods(cls, pattern):
+            _originals.append((cls, name, func))
+            setattr(cls, name, _wrap("{0}.{1}".format(cls.__name__, name), func))
+    if dates:
+        for name in DATE_PARSERS:
+            func = getattr(dateparse, name)
+            _originals.append((dateparse, name, func))
+            setattr(dateparse, name, _wrap("dateparse.{0}".format(name), func))
+
+
+def disable():
+    """
+    Restore original methods once disable has been called as often as enable
+    """
+    global _depth
+    if _depth > 1:
+        _depth -= 1
+        return
+    _depth = 0
+    while len(_originals) > 0:
+        owner, name, func = _originals.pop()
+        setattr(owner, name, func)
+
+
+def enabled():
+    """
+    Whether instrumentation is enabled
+    """
+    return _depth > 0
+
+
+def reset():
+    """
+    Reset counters and timings
+    """
+    _stats.clear()
+
+
+@contextlib.contextmanager
+def instrumented(classes=None, pattern=None, dates=True):
+    """
+    Enable instrumentation within context
+
+    Contexts can be nested, instrumentation ends with the outermost one.
+    """
+    enable(classes=classes, pattern=pattern, dates=dates)
+    try:
+        yield _stats
+    finally:
+        disable()
+
+
+def summary():
+    """
+    Calls, cumulative and mean seconds per instrumented method, ordered
+    by cumulative time
+    """
+    result = {}
+    for name, (calls, seconds) in sorted(_stats.items(), key=lambda item: item[1][1], reverse=True):
+        result[name] = {"calls": calls, "seconds": seconds, "mean": seconds / calls}
+    return result
+
+
+def _label(value):
+    return value.replace("\\", "\\\\").replace("\"", "\\\"")
+
+
+def prometheus(prefix="serialj"):
+    """
+    Calls and cumulative seconds per instrumented method in Prometheus text format
+    """
+    metrics = (
+        ("method_calls_total", "Number of calls of serialj methods", 0, "{0}"),
+        ("method_seconds_total", "Cumulative time spent in serialj methods in seconds", 1, "{0:.9f}"),
+    )
+    lines = []
+    for metric, description, field, template in metrics:
+        name = "{0}_{1}".format(prefix, metric)
+        lines.append("# HELP {0} {1}".format(name, description))
+        lines.append("# TYPE {0} counter".format(name))
+        for method, entry in sorted(_stats.items()):
+            lines.append("{0}{{method=\"{1}\"}} {2}".format(name, _label(method), template.format(entry[field])))
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,107 @@
+import re
+import json
+
+from .utils import loads
+from .marcjson import MarcJson
+from .picajson import PicaJson
+
+
+_decoder = json.JSONDecoder()
+_patterns = {}
+
+
+def _field_pattern(name):
+    pattern = _patterns.get(name)
+    if pattern is None:
+        # start of a field array, e.g. ["003@",
+        pattern = _patterns[name] = re.compile(r'\[\s*"' + re.escape(name) + r'"\s*,')
+    return pattern
+
+
+class LazyRecord:
+    """
+    Mixin for records built from raw JSON which is decoded on demand
+
+    Fields requested via get_field (and thus all getters built on it) are
+    located by a lightweight scan of the raw JSON and decoded one by one.
+    The complete record is only decoded once data or idx is accessed.
+    """
+
+    __slots__ = ()
+
+    def __init__(self, raw, **kwargs):
+        self._raw = raw
+        self._text = None
+        self._rows = {}
+        self._idx = None
+        super().__init__(None, **kwargs)
+
+    @property
+    def data(self):
+        if self._data is None and self._raw is not None:
+            self._data = loads(self._raw)
+            self._raw = None
+            self._text = None
+        return self._data
+
+    @data.setter
+    def data(self, value):
+        self._data = value
+
+    @property
+    def idx(self):
+        if self._idx is None:
+            self._idx = super()._indices()
+        return self._idx
+
+    @idx.setter
+    def idx(self, value):
+        self._idx = value
+
+    @property
+    def decoded(self):
+        """
+        Whether the complete record has been decoded
+        """
+        return self._raw is None
+
+    def _indices(self):
+        if self._raw is not None:
+            return None
+        return super()._indices()
+
+    def _field_rows(self, name):
+        if self._raw is None:
+            return super()._field_rows(name)
+        if name not in self._rows:
+            self._rows[name] = self._scan(name)
+        return self._rows[name]
+
+    def _scan(self, name):
+        if self._text is None:
+            if isinstance(self._raw, bytes):
+                self._text = self._raw.decode("utf-8")
+            else:
+                self._text = self._raw
+        rows = []
+        for match in _field_pattern(name).finditer(self._text):
+            row, _ = _decoder.raw_decode(self._text, match.start())
+            rows.append(row)
+        if len(rows) > 0:
+            return rows
+
+
+class LazyPicaJson(LazyRecord, PicaJson):
+    """
+    Class for lazily parsing raw PICA JSON (http://format.gbv.de/pica/json)
+    """
+
+    __slots__ = ("_raw", "_text", "_rows", "_idx", "_data")
+
+
+class LazyMarcJson(LazyRecord, MarcJson):
+    """
+    Class for lazily parsing raw MARC JSON (http://format.gbv.de/marc/json)
+    """
+
+    __slots__ = ("_raw", "_text", "_rows", "_idx", "_data")
@@ -1,42 +1,72 @@
 import logging
 import datetime
 
+from . import dateparse
+from .parser import Deferred
 from .serialj import SerialJson
 
 
+# values of blank indicators
+BLANK = (None, "", " ")
+
+
 class MarcJson(SerialJson):
     """
     Class for parsing MARC JSON (http://format.gbv.de/marc/json)
     """
 
-    def __init__(self, data, name=__name__, level=logging.INFO):
-        super().__init__(data, skip=3, name=name, level=level)
+    __slots__ = ("_holdings_idx",)
+
+    def __init__(self, data, name=__name__, level=logging.INFO, subfield_index=False, diagnostics=None, idx=None):
+        super().__init__(data, skip=3, name=name, level=level, subfield_index=subfield_index, diagnostics=diagnostics, idx=idx)
+        self._holdings_idx = {}
 
     def get_field(self, name, indicator1=None, indicator2=None, unique=False):
         found = []
-        positions = self._field_pos(name)
-        if positions is not None:
-            for i in positions:
-                if self.data[i][1] is not None and \
-                        self.data[i][1].strip() != "" and \
+        rows = self._field_rows(name)
+        if rows is not None and self.trusted:
+            # indicators of trusted records are single characters or empty
+            for row in rows:
+                if indicator1 is not None and row[1] not in BLANK and row[1] != indicator1:
+                    continue
+                if indicator2 is not None and row[2] not in BLANK and row[2] != indicator2:
+                    continue
+                found.append(row)
+        elif rows is not None:
+            for row in rows:
+                if row[1] is not None and \
+                        row[1].strip() != "" and \
                         indicator1 is not None and \
-                        self.data[i][1] != indicator1:
+                        row[1] != indicator1:
                     continue
-                if self.data[i][2] is not None and \
-                        self.data[i][2].strip() != "" and \
+                if row[2] is not None and \
+                        row[2].strip() != "" and \
                         indicator2 is not None and \
-                        self.data[i][2] != indicator2:
+                        row[2] != indicator2:
                     continue
-                found.append(self.data[i])
+                found.append(row)
         if unique:
-            if len(found) == 1:
-                return found[0]
-            else:
-                self.logger.warning("Expected field {0} to be unique. Found {1} occurrences.".format(name, len(found)))
+            return self._unique_field(name, found)
+        if len(found) > 0:
+            return found
+
+    def _unique_field(self, name, found):
+        if len(found) == 1:
+            return found[0]
+        self._report(logging.WARNING, "Expected field %s to be unique. Found %s occurrences.", name, len(found))
         if len(found) > 0:
             return found
 
     def get_value(self, field, subfield, indicator1=None, indicator2=None, unique=False, repeat=True, collapse=False, preserve=True):
+        if self.subidx is not None and not unique:
+            key = (field, subfield, indicator1, indicator2)
+            entry = self.subidx.get(key)
+            if entry is None:
+                entry = self._index_values(key, self.get_field(field, indicator1=indicator1, indicator2=indicator2))
+            if entry is not None:
+                return self._value_from_index(key, entry, repeat=repeat, collapse=collapse)
+            self._report(logging.ERROR, "Field %s with indicators %s and %s not found!", field, indicator1, indicator2)
+            return None
         found = self.get_field(field, indicator1=indicator1, indicator2=indicator2, unique=unique)
         if found is not None:
             if unique and type(found[0]) != list:
@@ -44,7 +74,15 @@ class MarcJson(SerialJson):
             else:
                 return self._value_from_rows(found, subfield, repeat=repeat, collapse=collapse, preserve=True)
         else:
-            self.logger.error("Field {0} with indicators {1} and {2} not found!".format(field, indicator1, indicator2))
+            self._report(logging.ERROR, "Field %s with indicators %s and %s not found!", field, indicator1, indicator2)
+
+    def _ppn(self):
+        # PPN for messages, looked up without reporting issues itself
+        rows = self._field_rows("001")
+        if rows is not None:
+            pos = self._subfield_pos(rows[0], "_")
+            if pos is not None:
+                return rows[0][pos[0]]
 
     def get_ppn(self):
         """
@@ -65,7 +103,7 @@ class MarcJson(SerialJson):
         latest_trans = self.get_latest_trans()
         if latest_trans is not None:
             try:
-                return datetime.datetime.strptime(latest_trans, "%Y%m%d%H%M%S.0")
+                return dateparse.marc_datetime(latest_trans)
             except ValueError:
                 return datetime.datetime.strptime(latest_trans, "%Y%m%d222222:2")
 
@@ -102,9 +140,9 @@ class MarcJson(SerialJson):
         date_entered = self.get_date_entered()
         if isinstance(date_entered, str):
             try:
-                return datetime.datetime.strptime(date_entered, "%y%m%d").date()
+                return dateparse.marc_date(date_entered)
             except ValueError:
-                self.logger.warning("Found invalid first entry date {0} in record with PPN {1}.".format(date_entered, self.get_ppn()))
+                self._report(logging.WARNING, "Found invalid first entry date %s in record with PPN %s.", date_entered, Deferred(self._ppn))
 
     def get_date_entered_iso(self):
         """
@@ -125,6 +163,57 @@ class MarcJson(SerialJson):
 
     # Indikator 2 - Nicht definiert
 
+    def _holdings_index(self, indicator1="0", indicator2=None):
+        key = (indicator1, indicator2)
+        if key not in self._holdings_idx:
+            index = {"epn": {}, "isil": {}}
+            holding_fields = self.get_field("924", indicator1=indicator1, indicator2=indicator2)
+            if holding_fields is not None:
+                for holding_field in holding_fields:
+                    for name, subfield in (("epn", "a"), ("isil", "b")):
+                        value = self._value_from_row(holding_field, subfield, repeat=False)
+                        if isinstance(value, str):
+                            if value in index[name]:
+                                index[name][value].append(holding_field)
+                            else:
+                                index[name][value] = [holding_field]
+            self._holdings_idx[key] = index
+        return self._holdings_idx[key]
+
+    def _holdings_by(self, name, value, indicator1="0", indicator2=None):
+        """
+        Holding fields with given EPN or ISIL via hash index
+        """
+        return self._holdings_index(indicator1=indicator1, indicator2=indicator2)[name].get(value)
+
+    def view(self, isil):
+        """
+        924/DNB: Bestandsinformationen
+          $b - ISIL als Kennzeichnung der besitzenden Institution
+
+        View of the record with all fields except holdings of other
+        libraries than the one with given ISIL, None if the library has no
+        holdings. The view is a new MarcJson sharing the field rows of the
+        record, with its own index of field positions (and subfield index).
+        """
+        data = self.data if self.data is not None else []
+        rows = []
+        found = False
+        for row in data:
+            if row[0] == "924":
+                pos = self._subfield_pos(row, "b")
+                if pos is None or row[pos[0]] != isil:
+                    continue
+                found = True
+            rows.append(row)
+        if not found:
+            return None
+        view = MarcJson(rows, name=self.logger.name, level=self.logger.level, diagnostics=self.diagnostics)
+        if self.subidx is not None:
+            view.subidx = {}
+        view.trusted = self.trusted
+        return view
+
     def get_holdings_epn(self, indicator1="0", indicator2=None):
         """
         924/DNB: Bestandsinformationen
@@ -145,17 +234,11 @@ class MarcJson(SerialJson):
           $b - ISIL als Kennzeichnung der besitzenden Institution
           $a - Lokale IDN des Bestandsdatensatzes
         """
-        isils = self.get_holdings_isil(indicator1=indicator1, indicator2=indicator2)
-        if isils is None or isil not in isils:
-            self.logger.info("Library {0} has no holding for record {1}".format(isil, self.get_ppn()))
+        holding_fields = self._holdings_by("isil", isil, indicator1=indicator1, indicator2=indicator2)
+        if holding_fields is None:
+            self._report(logging.INFO, "Library %s has no holding for record %s", isil, Deferred(self._ppn))
             return None
-        holdings = []
-        holding_fields = self.get_field("924")
-        for holding_field in holding_fields:
-            if self._value_from_row(holding_field, "b", repeat=False) == isil:
-                holdings.append(self._value_from_row(holding_field, "a", repeat=False))
-        if len(holdings) > 0:
-            return holdings
+        return [self._value_from_row(holding_field, "a", repeat=False) for holding_field in holding_fields]
 
     def get_holdings_status(self, indicator1="0", indicator2=None):
         """
@@ -170,14 +253,11 @@ class MarcJson(SerialJson):
           $a - Lokale IDN des Bestandsdatensatzes
           $d - Fernleihindikator
         """
-        epns = self.get_holdings_epn(indicator1=indicator1, indicator2=indicator2)
-        if epns is None or epn not in epns:
-            self.logger.info("Holding {0} not found in record {1}".format(epn, self.get_ppn()))
+        holding_fields = self._holdings_by("epn", epn, indicator1=indicator1, indicator2=indicator2)
+        if holding_fields is None:
+            self._report(logging.INFO, "Holding %s not found in record %s", epn, Deferred(self._ppn))
             return None
-        holding_fields = self.get_field("924")
-        for holding_field in holding_fields:
-            if self._value_from_row(holding_field, "a", repeat=False) == epn:
-                return self._value_from_row(holding_field, "d", repeat=False)
+        return self._value_from_row(holding_fields[0], "d", repeat=False)
 
     def get_holdings_isil_status(self, isil, indicator1="0", indicator2=None):
         """
@@ -185,17 +265,11 @@ class MarcJson(SerialJson):
           $b - ISIL als Kennzeichnung der besitzenden Institution
           $d - Fernleihindikator
         """
-        isils = self.get_holdings_isil(indicator1=indicator1, indicator2=indicator2)
-        if isils is None or isil not in isils:
-            self.logger.info("Library {0} has no holding for record {1}".format(isil, self.get_ppn()))
+        holding_fields = self._holdings_by("isil", isil, indicator1=indicator1, indicator2=indicator2)
+        if holding_fields is None:
+            self._report(logging.INFO, "Library %s has no holding for record %s", isil, Deferred(self._ppn))
             return None
-        statuses = []
-        holding_fields = self.get_field("924")
-        for holding_field in holding_fields:
-            if self._value_from_row(holding_field, "b", repeat=False) == isil:
-                statuses.append(self._value_from_row(holding_field, "d", repeat=False))
-        if len(statuses) > 0:
-            return statuses
+        return [self._value_from_row(holding_field, "d", repeat=False) for holding_field in holding_fields]
 
     def get_holdings_signature(self, indicator1="0", indicator2=None):
         """
@@ -203,7 +277,7 @@ class MarcJson(SerialJson):
           $g - Signatur
         """
         signatures = self.get_value("924", "g", indicator1=indicator1, indicator2=indicator2)
-        if len(signatures) > 0 and any(s[0] for s in signatures):
+        if signatures is not None and len(signatures) > 0 and any(s[0] for s in signatures):
             return signatures
 
     def get_holdings_epn_signature(self, epn, indicator1="0", indicator2=None):
@@ -212,14 +286,11 @@ class MarcJson(SerialJson):
           $a - Lokale IDN des Bestandsdatensatzes
           $g - Signatur
         """
-        epns = self.get_holdings_epn(indicator1=indicator1, indicator2=indicator2)
-        if epns is None or epn not in epns:
-            self.logger.info("Holding {0} not found in record {1}".format(epn, self.get_ppn()))
+        holding_fields = self._holdings_by("epn", epn, indicator1=indicator1, indicator2=indicator2)
+        if holding_fields is None:
+            self._report(logging.INFO, "Holding %s not found in record %s", epn, Deferred(self._ppn))
             return None
-        holding_fields = self.get_field("924")
-        for holding_field in holding_fields:
-            if self._value_from_row(holding_field, "a", repeat=False) == epn:
-                return self._value_from_row(holding_field, "g")
+        return self._value_from_row(holding_fields[0], "g")
 
     def get_holdings_isil_signature(self, isil, indicator1="0", indicator2=None):
         """
@@ -227,14 +298,10 @@ class MarcJson(SerialJson):
           $b - ISIL als Kennzeichnung der besitzenden Institution
           $g - Signatur
         """
-        isils = self.get_holdings_isil(indicator1=indicator1, indicator2=indicator2)
-        if isils is None or isil not in isils:
-            self.logger.info("Library {0} has no holding for record {1}".format(isil, self.get_ppn()))
+        holding_fields = self._holdings_by("isil", isil, indicator1=indicator1, indicator2=indicator2)
+        if holding_fields is None:
+            self._report(logging.INFO, "Library %s has no holding for record %s", isil, Deferred(self._ppn))
             return None
-        signatures = []
-        holding_fields = self.get_field("924")
-        for holding_field in holding_fields:
-            if self._value_from_row(holding_field, "b", repeat=False) == isil:
-                signatures.append(self._value_from_row(holding_field, "g"))
-        if len(signatures) > 0 and any(s for s in signatures):
+        signatures = [self._value_from_row(holding_field, "g") for holding_field in holding_fields]
+        if any(s for s in signatures):
             return signatures
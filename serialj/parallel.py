@@ -0,0 +1,150 @@
+import os
+import logging
+import threading
+import multiprocessing
+
+from .extractor import compile_getters
+from .stream import record_class, stream_lines
+from .utils import is_compressed, loads, set_stream
+
+
+logger = logging.getLogger(__name__)
+set_stream(logger)
+
+CHUNK_SIZE = 16 * 1024 * 1024
+
+
+def _chunk_ranges(path, chunk_size=CHUNK_SIZE):
+    """
+    Split file at given path into byte ranges ending on line boundaries
+    """
+    size = os.path.getsize(path)
+    ranges = []
+    start = 0
+    with open(path, "rb") as f:
+        while start < size:
+            f.seek(min(start + chunk_size, size))
+            f.readline()
+            end = min(f.tell(), size)
+            ranges.append((start, end))
+            start = end
+    return ranges
+
+
+def _line_batches(path, chunk_size=CHUNK_SIZE):
+    """
+    Group lines of (compressed) file at given path into batches of about chunk_size bytes
+    """
+    batch = []
+    batch_size = 0
+    for line in stream_lines(path):
+        batch.append(line)
+        batch_size += len(line)
+        if batch_size >= chunk_size:
+            yield batch
+            batch = []
+            batch_size = 0
+    if len(batch) > 0:
+        yield batch
+
+
+class _BoundedTasks:
+    """
+    Iterator over tasks with at most window tasks in flight
+
+    The pool takes a task only after the result of an earlier task has
+    been consumed (see done), so batches of a compressed dump are not
+    read ahead of the workers. Iteration ends once stop is called.
+    """
+
+    def __init__(self, tasks, window):
+        self.tasks = tasks
+        self.slots = threading.Semaphore(window)
+        self.stopped = threading.Event()
+
+    def __iter__(self):
+        for task in self.tasks:
+            while not self.slots.acquire(timeout=0.1):
+                if self.stopped.is_set():
+                    return
+            if self.stopped.is_set():
+                return
+            yield task
+
+    def done(self):
+        self.slots.release()
+
+    def stop(self):
+        self.stopped.set()
+
+
+def _extract_lines(lines, format, fields):
+    cls = record_class(format)
+    results = []
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            record = cls(loads(line))
+        except ValueError as err:
+            logger.error("Skipping invalid record: {0}".format(err))
+            continue
+        result = {}
+        for name, getter, kwargs in fields:
+            try:
+                result[name] = getattr(record, getter)(**kwargs)
+            except Exception as err:
+                logger.error("Failed to extract {0} from record {1}: {2!r}".format(name, record.get_ppn(), err))
+                result[name] = None
+        results.append(result)
+    return results
+
+
+def _extract_range(task):
+    path, start, end, format, fields = task
+    with open(path, "rb") as f:
+        f.seek(start)
+        lines = f.read(end - start).splitlines()
+    return _extract_lines(lines, format, fields)
+
+
+def _extract_batch(task):
+    lines, format, fields = task
+    return _extract_lines(lines, format, fields)
+
+
+def extract(path, fields, format="pica", workers=None, ordered=True, chunk_size=CHUNK_SIZE):
+    """
+    Extract fields from records of NDJSON dump at given path in parallel
+
+    Uncompressed dumps are split into byte ranges on line boundaries
+    which are read by the worker processes themselves. Compressed dumps
+    are decompressed by the calling process and handed out in batches,
+    at most two batches per worker are in flight at any time. Results are
+    yielded as dictionaries, one per record, in file order unless ordered
+    is False.
+    """
+    compiled = compile_getters(fields, cls=record_class(format))
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if is_compressed(path):
+        tasks = _BoundedTasks(((batch, format, compiled) for batch in _line_batches(path, chunk_size=chunk_size)), 2 * workers)
+        func = _extract_batch
+    else:
+        tasks = [(path, start, end, format, compiled) for start, end in _chunk_ranges(path, chunk_size=chunk_size)]
+        func = _extract_range
+    bounded = isinstance(tasks, _BoundedTasks)
+    with multiprocessing.Pool(workers) as pool:
+        try:
+            if ordered:
+                chunks = pool.imap(func, tasks)
+            else:
+                chunks = pool.imap_unordered(func, tasks)
+            for chunk in chunks:
+                if bounded:
+                    tasks.done()
+                for result in chunk:
+                    yield result
+        finally:
+            if bounded:
+                tasks.stop()
@@ -1,18 +1,80 @@
 import logging
+import collections
 from .utils import set_stream
 
 
+DIAGNOSTICS = (None, "collect", "count")
+
+_loggers = {}
+
+
+def get_logger(name, level=None):
+    """
+    Get shared logger with given name, set up with a log stream on first use
+    """
+    logger = _loggers.get(name)
+    if logger is None:
+        logger = logging.getLogger(name)
+        if level is None:
+            level = logging.INFO
+        if not logger.handlers:
+            set_stream(logger, level=level)
+        _loggers[name] = logger
+    return logger
+
+
+class Deferred:
+    """
+    Log message argument evaluated only when the message is formatted
+    """
+
+    __slots__ = ("func",)
+
+    def __init__(self, func):
+        self.func = func
+
+    def __str__(self):
+        return str(self.func())
+
+
 class Parser:
     """
     Generic parser class
+
+    Issues found while parsing are logged by default. With diagnostics set
+    to "collect", they are appended to the list issues as (level, message,
+    arguments) tuples instead. With "count", only the number of occurrences
+    per message is counted in issues.
     """
 
-    def __init__(self, data, name, level):
+    __slots__ = ("data", "logger", "diagnostics", "issues")
+
+    def __init__(self, data, name, level, diagnostics=None):
         self.data = data
         if name is None:
             name = __name__
-        self.logger = logging.getLogger(name)
-        if level is None:
-            level = logging.INFO
-        if not self.logger.handlers:
-            set_stream(self.logger, level=level)
+        self.logger = get_logger(name, level=level)
+        if diagnostics not in DIAGNOSTICS:
+            raise ValueError("Unknown diagnostics mode {0}. Expected one of: {1}".format(diagnostics, DIAGNOSTICS))
+        self.diagnostics = diagnostics
+        if diagnostics == "collect":
+            self.issues = []
+        elif diagnostics == "count":
+            self.issues = collections.Counter()
+        else:
+            self.issues = None
+
+    def _report(self, level, msg, *args):
+        if self.diagnostics is None:
+            self.logger.log(level, msg, *args)
+        elif self.diagnostics == "count":
+            self.issues[msg] += 1
+        else:
+            self.issues.append((level, msg, args))
+
+    def get_issues(self):
+        """
+        Formatted messages of collected issues
+        """
+        if self.diagnostics == "collect":
+            return [msg % args for level, msg, args in self.issues]
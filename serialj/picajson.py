@@ -1,45 +1,116 @@
 import logging
 import datetime
+import collections
 
+from . import dateparse
+from .parser import Deferred
 from .serialj import SerialJson
 
 
+# level 2 fields (Exemplardaten) and subfields collected per holding
+HOLDING_SUBFIELDS = {
+    "203@": (("epn", "0"),),
+    "209A": (("isil", "B"), ("signature", "a"), ("status", "D")),
+    "201A": (("first_entry_date", "0"),),
+    "201B": (("latest_change_date", "0"), ("latest_change_time", "t")),
+    "201D": (("source_first_entry", "0"),),
+    "208@": (("new_date", "a"), ("new_key", "b")),
+    "209R": (("url", "u"),),
+}
+
+HOLDING_FIELDS = ("iln", "occurrence") + tuple(name for subfields in HOLDING_SUBFIELDS.values() for name, _ in subfields)
+
+
+class PicaHolding(collections.namedtuple("PicaHolding", HOLDING_FIELDS)):
+    """
+    Holding (level 2 block) of a PICA record with the ILN of its level 1 block
+    """
+
+    __slots__ = ()
+
+    @property
+    def eln(self):
+        """
+        201D/7901: Quelle der Ersterfassung (Exemplardaten)
+        """
+        if self.source_first_entry is not None:
+            return self.source_first_entry.split(":")[0]
+
+    @property
+    def latest_change_str(self):
+        """
+        201B/7903: Datum und Uhrzeit der letzten Änderung (Exemplardaten)
+        """
+        if self.latest_change_date is not None and self.latest_change_time is not None:
+            return "{0} {1}".format(self.latest_change_date, self.latest_change_time)
+
+
 class PicaJson(SerialJson):
     """
     Class for parsing PICA JSON (http://format.gbv.de/pica/json)
     """
 
-    def __init__(self, data, name=__name__, level=logging.INFO):
-        super().__init__(data, skip=2, name=name, level=level)
+    __slots__ = ("_holdings", "_holdings_idx", "_blocks")
+
+    def __init__(self, data, name=__name__, level=logging.INFO, subfield_index=False, diagnostics=None, idx=None):
+        super().__init__(data, skip=2, name=name, level=level, subfield_index=subfield_index, diagnostics=diagnostics, idx=idx)
+        self._holdings = None
+        self._holdings_idx = None
+        self._blocks = None
 
     def get_field(self, name, occurrence=None, unique=False):
         found = []
-        positions = self._field_pos(name)
-        if positions is not None:
-            for i in positions:
-                if self.data[i][1] is not None and \
-                        self.data[i][1].strip() != "" and \
+        rows = self._field_rows(name)
+        if rows is not None and self.trusted:
+            # occurrences of trusted records are empty or numeric
+            if occurrence is None:
+                found = rows
+            else:
+                found = [row for row in rows if not row[1] or row[1] == occurrence]
+        elif rows is not None:
+            for row in rows:
+                if row[1] is not None and \
+                        row[1].strip() != "" and \
                         occurrence is not None and \
-                        self.data[i][1] != occurrence:
+                        row[1] != occurrence:
                     continue
-                found.append(self.data[i])
+                found.append(row)
         if unique:
-            if len(found) == 1:
-                return found[0]
-            elif len(found) > 1:
-                self.logger.warning("Expected field {0} to be unique. Found {1} occurrences in record with PPN {2}.".format(name, len(found), self.get_ppn()))
-                return found[0]
+            return self._unique_field(name, found)
         if len(found) > 0:
             return found
 
+    def _unique_field(self, name, found):
+        if len(found) == 1:
+            return found[0]
+        elif len(found) > 1:
+            self._report(logging.WARNING, "Expected field %s to be unique. Found %s occurrences in record with PPN %s.", name, len(found), Deferred(self._ppn))
+            return found[0]
+
     def get_value(self, field, subfield, occurrence=None, unique=False, repeat=True, collapse=False, preserve=True):
+        if self.subidx is not None and not unique:
+            key = (field, subfield, occurrence)
+            entry = self.subidx.get(key)
+            if entry is None:
+                entry = self._index_values(key, self.get_field(field, occurrence=occurrence))
+            if entry is not None:
+                return self._value_from_index(key, entry, repeat=repeat, collapse=collapse)
+            return None
         found = self.get_field(field, occurrence=occurrence, unique=unique)
         if found is not None:
-            if unique and type(found[0]) != list:
+            if unique and (self.trusted or type(found[0]) != list):
                 return self._value_from_row(found, subfield, repeat=repeat)
             else:
                 return self._value_from_rows(found, subfield, repeat=repeat, collapse=collapse, preserve=True)
 
+    def _ppn(self):
+        # PPN for messages, looked up without reporting issues itself
+        rows = self._field_rows("003@")
+        if rows is not None:
+            pos = self._subfield_pos(rows[0], "0")
+            if pos is not None:
+                return rows[0][pos[0]]
+
     def get_ppn(self):
         """
         003@/0100: Pica-Produktionsnummer
@@ -70,9 +141,9 @@ class PicaJson(SerialJson):
         """
         first_entry_date = self.get_first_entry_date()
         try:
-            return datetime.datetime.strptime(first_entry_date, "%d-%m-%y").date()
+            return dateparse.pica_date(first_entry_date)
         except ValueError:  # "00-00-00"
-            self.logger.warning("Found invalid first entry date {0} in record with PPN {1}.".format(first_entry_date, self.get_ppn()))
+            self._report(logging.WARNING, "Found invalid first entry date %s in record with PPN %s.", first_entry_date, Deferred(self._ppn))
 
     def get_first_entry_date_iso(self):
         """
@@ -120,7 +191,7 @@ class PicaJson(SerialJson):
         """
         change_datetime = self.get_latest_change_str()
         try:
-            return datetime.datetime.strptime(change_datetime, "%d-%m-%y %H:%M:%S.%f")
+            return dateparse.pica_datetime(change_datetime)
         except ValueError:
             return datetime.datetime.strptime(change_datetime, "%d-%m-%y 22:22:22:222")
 
@@ -137,6 +208,145 @@ class PicaJson(SerialJson):
         """
         return self.get_value("045R", "a", unique=False, repeat=False, collapse=collapse)
 
+    def holdings(self):
+        """
+        101@: ILNs der Exemplardaten
+        2xxx: Exemplardaten
+
+        Holdings of the record as PicaHolding objects, built in one pass over
+        the record. Level 2 fields are grouped by occurrence within the level 1
+        block of each ILN. Of repeated fields, the first value found is used.
+        Values of fields missing from a holding are None, values of subfields
+        missing from its fields are empty, as with get_holdings_status etc.
+        """
+        if self._holdings is None:
+            self._holdings = self._build_holdings()
+        return self._holdings
+
+    def _build_holdings(self):
+        holdings = []
+        iln = None
+        copies = {}
+        if self.data is None:
+            return holdings
+        for row in self.data:
+            tag = row[0]
+            if tag == "101@":
+                holdings.extend(self._holdings_block(iln, copies))
+                pos = self._subfield_pos(row, "a")
+                iln = row[pos[0]] if pos is not None else None
+                copies = {}
+            elif tag in HOLDING_SUBFIELDS:
+                copy = copies.get(row[1])
+                if copy is None:
+                    copy = copies[row[1]] = {}
+                for name, subfield in HOLDING_SUBFIELDS[tag]:
+                    if not copy.get(name):
+                        pos = self._subfield_pos(row, subfield)
+                        copy[name] = row[pos[0]] if pos is not None else ""
+        holdings.extend(self._holdings_block(iln, copies))
+        return holdings
+
+    @staticmethod
+    def _holdings_block(iln, copies):
+        for occurrence, copy in copies.items():
+            yield PicaHolding(iln, occurrence, *(copy.get(name) for name in HOLDING_FIELDS[2:]))
+
+    def _holdings_index(self):
+        if self._holdings_idx is None:
+            index = {"epn": {}, "isil": {}, "iln": {}, "eln": {}}
+            for i, holding in enumerate(self.holdings()):
+                for key in index:
+                    value = getattr(holding, key)
+                    if value is not None:
+                        if value in index[key]:
+                            index[key][value].append(i)
+                        else:
+                            index[key][value] = [i]
+            self._holdings_idx = index
+        return self._holdings_idx
+
+    def _holdings_by(self, key, value, occurrence="01"):
+        """
+        Holdings with given EPN, ISIL, ILN or ELN (and occurrence) via hash index
+        """
+        positions = self._holdings_index()[key].get(value)
+        if positions is not None:
+            holdings = self.holdings()
+            found = [holdings[i] for i in positions if occurrence is None or holdings[i].occurrence == occurrence]
+            if len(found) > 0:
+                return found
+
+    def _holding_from_epn(self, epn, occurrence="01"):
+        found = self._holdings_by("epn", epn, occurrence=occurrence)
+        if found is not None and len(found) == 1:
+            return found[0]
+
+    def _holding_blocks(self):
+        """
+        End of level 0 fields and spans of level 1 blocks by ILN
+        """
+        if self._blocks is None:
+            data = self.data if self.data is not None else []
+            # level 1 blocks start at the 101@ fields, only those are accessed
+            starts = list(self._field_pos("101@") or ())
+            level0 = starts[0] if len(starts) > 0 else len(data)
+            blocks = {}
+            for start, end in zip(starts, starts[1:] + [len(data)]):
+                row = data[start]
+                pos = self._subfield_pos(row, "a")
+                iln = row[pos[0]] if pos is not None else None
+                if iln in blocks:
+                    blocks[iln].append((start, end))
+                else:
+                    blocks[iln] = [(start, end)]
+            self._blocks = (level0, blocks)
+        return self._blocks
+
+    def view(self, iln):
+        """
+        101@: ILNs der Exemplardaten
+
+        View of the record with its level 0 fields and the level 1 and 2
+        fields of the library with given ILN, None if the library has no
+        holdings. The view is a new PicaJson sharing the field rows of the
+        record, with its own index of field positions (and subfield index).
+        """
+        return self._view(iln, self.data)
+
+    def _view(self, iln, data):
+        level0, blocks = self._holding_blocks()
+        spans = blocks.get(iln)
+        if spans is None:
+            return None
+        if isinstance(data, list):
+            rows = data[:level0]
+            for start, end in spans:
+                rows.extend(data[start:end])
+        else:
+            # rows of compact records are created on access, only those
+            # of the view are created
+            rows = [data[i] for i in range(level0)]
+            for start, end in spans:
+                rows.extend(data[i] for i in range(start, end))
+        view = PicaJson(rows, name=self.logger.name, level=self.logger.level, diagnostics=self.diagnostics)
+        if self.subidx is not None:
+            view.subidx = {}
+        view.trusted = self.trusted
+        return view
+
+    def views(self):
+        """
+        101@: ILNs der Exemplardaten
+
+        Views of the record by ILN of each library with holdings (see view)
+        """
+        data = self.data
+        if data is not None and not isinstance(data, list):
+            # create rows of compact records once for all views
+            data = list(data)
+        return {iln: self._view(iln, data) for iln in self._holding_blocks()[1]}
+
     def get_holdings_epn(self, occurrence="01"):
         """
         203@/7800: EPN (Exemplardaten)
@@ -195,17 +405,9 @@ class PicaJson(SerialJson):
         101@: ILNs der Exemplardaten
         203@/7800: EPN (Exemplardaten)
         """
-        index = self.get_holdings_iln_index(iln, occurrence=None)
-        if index is not None:
-            epns = self.get_holdings_epn(occurrence="01")
-            if epns is not None and len(epns) == self.get_holdings_iln_count(occurrence=None):
-                holdings = []
-                for i in index:
-                    holdings.append(epns[i])
-                if len(holdings) > 0:
-                    return holdings
-            else:
-                self.logger.error("Unequal number of holding ILNs and EPNs in record {0}".format(self.get_ppn()))
+        found = self._holdings_by("iln", iln, occurrence="01")
+        if found is not None:
+            return [h.epn for h in found]
 
     def get_holdings_signature(self, occurrence="01"):
         """
@@ -220,14 +422,9 @@ class PicaJson(SerialJson):
         209A/7100: Signatur (Exemplardaten)
           $a    Signatur
         """
-        index = self.get_holdings_epn_index(epn, occurrence=occurrence)
-        if index is not None:
-            signatures = self.get_holdings_signature(occurrence=occurrence)
-            if signatures is not None:
-                if len(signatures) == self.get_holdings_epn_count(occurrence=occurrence):
-                    return signatures[index]
-                else:
-                    self.logger.error("Unequal number of holding EPNs and signatures in record {0}".format(self.get_ppn()))
+        holding = self._holding_from_epn(epn, occurrence=occurrence)
+        if holding is not None:
+            return holding.signature
 
     def get_holdings_status(self, occurrence="01"):
         """
@@ -242,16 +439,9 @@ class PicaJson(SerialJson):
         209A/7100: Signatur (Exemplardaten)
           $D    Ausleihindikator (nur SWB)
         """
-        index = self.get_holdings_epn_index(epn, occurrence=occurrence)
-        if index is not None:
-            statuses = self.get_holdings_status(occurrence=occurrence)
-            if statuses is not None:
-                if len(statuses) == self.get_holdings_epn_count(occurrence=occurrence):
-                    return statuses[index]
-                else:
-                    self.logger.error("Unequal number of holding EPNs and statuses in record {0}".format(self.get_ppn()))
-
-        return self.get_value("209A", "D", occurrence=occurrence, repeat=False)
+        holding = self._holding_from_epn(epn, occurrence=occurrence)
+        if holding is not None:
+            return holding.status
 
     def get_holdings_isil_status(self, isil, occurrence="01"):
         """
@@ -259,18 +449,9 @@ class PicaJson(SerialJson):
           $B    Sigel (nur SWB)
           $D    Ausleihindikator (nur SWB)
         """
-        index = self.get_holdings_isil_index(isil)
-        if index is not None:
-            statuses = self.get_holdings_status(occurrence=occurrence)
-            if statuses is not None:
-                if len(statuses) == self.get_holdings_isil_count(occurrence=occurrence):
-                    isil_statuses = []
-                    for i in index:
-                        isil_statuses.append(statuses[i])
-                    if len(isil_statuses) > 0:
-                        return isil_statuses
-                else:
-                    self.logger.error("Unequal number of holding ISILs and statuses in record {0}".format(self.get_ppn()))
+        found = self._holdings_by("isil", isil, occurrence=occurrence)
+        if found is not None:
+            return [h.status for h in found]
 
     def get_holdings_isil(self, occurrence="01"):
         """
@@ -309,18 +490,9 @@ class PicaJson(SerialJson):
           $B    Sigel (nur SWB)
         203@/7800: EPN (Exemplardaten)
         """
-        index = self.get_holdings_isil_index(isil, occurrence=occurrence)
-        if index is not None:
-            epns = self.get_holdings_epn(occurrence=occurrence)
-            if epns is not None:
-                if len(epns) == self.get_holdings_isil_count(occurrence=occurrence):
-                    holdings = []
-                    for i in index:
-                        holdings.append(epns[i])
-                    if len(holdings) > 0:
-                        return holdings
-                else:
-                    self.logger.error("Unequal number of holding ISILs and EPNs in record {0}".format(self.get_ppn()))
+        found = self._holdings_by("isil", isil, occurrence=occurrence)
+        if found is not None:
+            return [h.epn for h in found]
 
     def get_holdings_first_entry_date(self, occurrence="01"):
         """
@@ -336,7 +508,7 @@ class PicaJson(SerialJson):
         if first_entry_dates is not None:
             first_entry_date_objs = []
             for first_entry_date in first_entry_dates:
-                first_entry_date_objs.append(datetime.datetime.strptime(first_entry_date, "%d-%m-%y").date())
+                first_entry_date_objs.append(dateparse.pica_date(first_entry_date))
             return first_entry_date_objs
 
     def get_holdings_first_entry_date_iso(self, occurrence="01"):
@@ -347,7 +519,7 @@ class PicaJson(SerialJson):
         if first_entry_dates is not None:
             first_entry_date_iso = []
             for first_entry_date in first_entry_dates:
-                first_entry_date_iso.append(datetime.datetime.strptime(first_entry_date, "%d-%m-%y").date().isoformat())
+                first_entry_date_iso.append(dateparse.pica_date(first_entry_date).isoformat())
             return first_entry_date_iso
 
     def get_holdings_latest_change_date(self, occurrence="01"):
@@ -370,7 +542,7 @@ class PicaJson(SerialJson):
         latest_change_time = self.get_holdings_latest_change_time(occurrence=occurrence)
         if latest_change_date is not None and latest_change_time is not None:
             if len(latest_change_date) != len(latest_change_time):
-                self.logger.error("Unequal number of edit dates and times in holding data of record {0}".format(self.get_ppn()))
+                self._report(logging.ERROR, "Unequal number of edit dates and times in holding data of record %s", Deferred(self._ppn))
                 return None
             latest_change_str = []
             for i in range(len(latest_change_date)):
@@ -387,7 +559,7 @@ class PicaJson(SerialJson):
             latest_change_datetime = []
             for ch_str in change_str:
                 if ch_str != "" and ch_str is not None:
-                    latest_change_datetime.append(datetime.datetime.strptime(ch_str, "%d-%m-%y %H:%M:%S.%f"))
+                    latest_change_datetime.append(dateparse.pica_datetime(ch_str))
                 else:
                     latest_change_datetime.append(ch_str)
             if len(latest_change_datetime) > 0:
@@ -402,7 +574,7 @@ class PicaJson(SerialJson):
             latest_change_iso = []
             for ch_str in change_str:
                 if ch_str != "" and ch_str is not None:
-                    latest_change_iso.append(datetime.datetime.strptime(ch_str, "%d-%m-%y %H:%M:%S.%f").isoformat())
+                    latest_change_iso.append(dateparse.pica_datetime(ch_str).isoformat())
                 else:
                     latest_change_iso.append(ch_str)
             if len(latest_change_iso) > 0:
@@ -413,14 +585,9 @@ class PicaJson(SerialJson):
         203@/7800: EPN (Exemplardaten)
         201B/7903: Datum und Uhrzeit der letzten Änderung (Exemplardaten)
         """
-        index = self.get_holdings_epn_index(epn, occurrence=occurrence)
-        if index is not None:
-            change_str = self.get_holdings_latest_change_str(occurrence=occurrence)
-            if change_str is not None:
-                if len(change_str) == self.get_holdings_epn_count(occurrence=occurrence):
-                    return change_str[index]
-                else:
-                    self.logger.error("Unequal number of holding EPNs and modified timestamps in record {0}".format(self.get_ppn()))
+        holding = self._holding_from_epn(epn, occurrence=occurrence)
+        if holding is not None:
+            return holding.latest_change_str
 
     def get_holdings_epn_latest_change_datetime(self, epn, occurrence="01"):
         """
@@ -429,7 +596,7 @@ class PicaJson(SerialJson):
         """
         change_str = self.get_holdings_epn_latest_change_str(epn, occurrence=occurrence)
         if change_str is not None:
-            return datetime.datetime.strptime(change_str, "%d-%m-%y %H:%M:%S.%f")
+            return dateparse.pica_datetime(change_str)
 
     def get_holdings_epn_latest_change_iso(self, epn, occurrence="01"):
         """
@@ -446,18 +613,9 @@ class PicaJson(SerialJson):
           $B    Sigel (nur SWB)
         201B/7903: Datum und Uhrzeit der letzten Änderung (Exemplardaten)
         """
-        index = self.get_holdings_isil_index(isil)
-        if index is not None:
-            change_str = self.get_holdings_latest_change_str(occurrence=occurrence)
-            if change_str is not None:
-                if len(change_str) == self.get_holdings_isil_count(occurrence=occurrence):
-                    isil_latest_change_str = []
-                    for i in index:
-                        isil_latest_change_str.append(change_str[i])
-                    if len(isil_latest_change_str) > 0:
-                        return isil_latest_change_str
-                else:
-                    self.logger.error("Unequal number of holding ISILs and modified timestamps in record {0}".format(self.get_ppn()))
+        found = self._holdings_by("isil", isil, occurrence=occurrence)
+        if found is not None:
+            return [h.latest_change_str for h in found]
 
     def get_holdings_isil_latest_change_datetime(self, isil, occurrence="01"):
         """
@@ -469,7 +627,10 @@ class PicaJson(SerialJson):
         if change_str is not None:
             latest_change_datetime = []
             for ch_str in change_str:
-                latest_change_datetime.append(datetime.datetime.strptime(ch_str, "%d-%m-%y %H:%M:%S.%f"))
+                if ch_str is not None:
+                    latest_change_datetime.append(dateparse.pica_datetime(ch_str))
+                else:
+                    latest_change_datetime.append(None)
             if len(latest_change_datetime) > 0:
                 return latest_change_datetime
 
@@ -483,7 +644,10 @@ class PicaJson(SerialJson):
         if change_str is not None:
             latest_change_iso = []
             for ch_str in change_str:
-                latest_change_iso.append(datetime.datetime.strptime(ch_str, "%d-%m-%y %H:%M:%S.%f").isoformat())
+                if ch_str is not None:
+                    latest_change_iso.append(dateparse.pica_datetime(ch_str).isoformat())
+                else:
+                    latest_change_iso.append(None)
             if len(latest_change_iso) > 0:
                 return latest_change_iso
 
@@ -492,18 +656,9 @@ class PicaJson(SerialJson):
         101@: ILNs der Exemplardaten
         201B/7903: Datum und Uhrzeit der letzten Änderung (Exemplardaten)
         """
-        index = self.get_holdings_iln_index(iln, occurrence=None)
-        if index is not None:
-            change_str = self.get_holdings_latest_change_str(occurrence="01")
-            if change_str is not None:
-                if len(change_str) == self.get_holdings_iln_count(occurrence=None):
-                    isil_latest_change_str = []
-                    for i in index:
-                        isil_latest_change_str.append(change_str[i])
-                    if len(isil_latest_change_str) > 0:
-                        return isil_latest_change_str
-                else:
-                    self.logger.error("Unequal number of holding ILNs and EPNs in record {0}".format(self.get_ppn()))
+        found = self._holdings_by("iln", iln, occurrence="01")
+        if found is not None:
+            return [h.latest_change_str for h in found]
 
     def get_holdings_iln_latest_change_datetime(self, iln):
         """
@@ -514,7 +669,10 @@ class PicaJson(SerialJson):
         if change_str is not None:
             latest_change_datetime = []
             for ch_str in change_str:
-                latest_change_datetime.append(datetime.datetime.strptime(ch_str, "%d-%m-%y %H:%M:%S.%f"))
+                if ch_str is not None:
+                    latest_change_datetime.append(dateparse.pica_datetime(ch_str))
+                else:
+                    latest_change_datetime.append(None)
             if len(latest_change_datetime) > 0:
                 return latest_change_datetime
 
@@ -527,7 +685,10 @@ class PicaJson(SerialJson):
         if change_str is not None:
             latest_change_iso = []
             for ch_str in change_str:
-                latest_change_iso.append(datetime.datetime.strptime(ch_str, "%d-%m-%y %H:%M:%S.%f").isoformat())
+                if ch_str is not None:
+                    latest_change_iso.append(dateparse.pica_datetime(ch_str).isoformat())
+                else:
+                    latest_change_iso.append(None)
             if len(latest_change_iso) > 0:
                 return latest_change_iso
 
@@ -569,7 +730,7 @@ class PicaJson(SerialJson):
         if source_first_entry_date is not None:
             dates = []
             for sfe_date in source_first_entry_date:
-                dates.append(datetime.datetime.strptime(sfe_date, "%d-%m-%y").date())
+                dates.append(dateparse.pica_date(sfe_date))
             if len(dates) > 0:
                 return dates
 
@@ -616,35 +777,18 @@ class PicaJson(SerialJson):
         201D/7901: Quelle der Ersterfassung (Exemplardaten)
         203@/7800: EPN (Exemplardaten)
         """
-        index = self.get_holdings_eln_index(eln, occurrence=occurrence)
-        if index is not None:
-            epns = self.get_holdings_epn(occurrence=occurrence)
-            if epns is not None and len(epns) == self.get_holdings_eln_count(occurrence=occurrence):
-                holdings = []
-                for i in index:
-                    holdings.append(epns[i])
-                if len(holdings) > 0:
-                    return holdings
-            else:
-                self.logger.error("Unequal number of holding ELNs and EPNs in record {0}".format(self.get_ppn()))
+        found = self._holdings_by("eln", eln, occurrence=occurrence)
+        if found is not None:
+            return [h.epn for h in found]
 
     def get_holdings_eln_latest_change_str(self, eln, occurrence="01"):
         """
         201B/7903: Datum und Uhrzeit der letzten Änderung (Exemplardaten)
         201D/7901: Quelle der Ersterfassung (Exemplardaten)
         """
-        index = self.get_holdings_eln_index(eln, occurrence=occurrence)
-        if index is not None:
-            change_str = self.get_holdings_latest_change_str(occurrence=occurrence)
-            if change_str is not None:
-                if len(change_str) == self.get_holdings_eln_count(occurrence=occurrence):
-                    isil_latest_change_str = []
-                    for i in index:
-                        isil_latest_change_str.append(change_str[i])
-                    if len(isil_latest_change_str) > 0:
-                        return isil_latest_change_str
-                else:
-                    self.logger.error("Unequal number of holding ELNs and EPNs in record {0}".format(self.get_ppn()))
+        found = self._holdings_by("eln", eln, occurrence=occurrence)
+        if found is not None:
+            return [h.latest_change_str for h in found]
 
     def get_holdings_eln_latest_change_datetime(self, eln, occurrence="01"):
         """
@@ -655,7 +799,10 @@ class PicaJson(SerialJson):
         if change_str is not None:
             latest_change_datetime = []
             for ch_str in change_str:
-                latest_change_datetime.append(datetime.datetime.strptime(ch_str, "%d-%m-%y %H:%M:%S.%f"))
+                if ch_str is not None:
+                    latest_change_datetime.append(dateparse.pica_datetime(ch_str))
+                else:
+                    latest_change_datetime.append(None)
             if len(latest_change_datetime) > 0:
                 return latest_change_datetime
 
@@ -668,7 +815,10 @@ class PicaJson(SerialJson):
         if change_str is not None:
             latest_change_iso = []
             for ch_str in change_str:
-                latest_change_iso.append(datetime.datetime.strptime(ch_str, "%d-%m-%y %H:%M:%S.%f").isoformat())
+                if ch_str is not None:
+                    latest_change_iso.append(dateparse.pica_datetime(ch_str).isoformat())
+                else:
+                    latest_change_iso.append(None)
             if len(latest_change_iso) > 0:
                 return latest_change_iso
 
@@ -707,7 +857,7 @@ class PicaJson(SerialJson):
             for sfe_date in first_entry_date:
                 sfe_date_date = None
                 try:
-                    sfe_date_date = datetime.datetime.strptime(sfe_date, "%d-%m-%y").date()
+                    sfe_date_date = dateparse.pica_date(sfe_date)
                 except ValueError:  # xx-xx-xx
                     pass
                 dates.append(sfe_date_date)
@@ -752,7 +902,7 @@ class PicaJson(SerialJson):
         if new_date is not None:
             dates = []
             for n_date in new_date:
-                dates.append(datetime.datetime.strptime(n_date, "%d-%m-%y").date())
+                dates.append(dateparse.pica_date(n_date))
             if len(dates) > 0:
                 return dates
 
@@ -776,18 +926,9 @@ class PicaJson(SerialJson):
         209A/7100: Signatur (Exemplardaten)
           $B    Sigel (nur SWB)
         """
-        index = self.get_holdings_isil_index(isil, occurrence=occurrence)
-        if index is not None:
-            new_dates = self.get_holdings_new_date(occurrence=occurrence)
-            if new_dates is not None:
-                if len(new_dates) == self.get_holdings_isil_count(occurrence=occurrence):
-                    dates = []
-                    for i in index:
-                        dates.append(new_dates[i])
-                    if len(dates) > 0:
-                        return dates
-                else:
-                    self.logger.error("Unequal number of holding ISILs and new dates in record {0}".format(self.get_ppn()))
+        found = self._holdings_by("isil", isil, occurrence=occurrence)
+        if found is not None:
+            return [h.new_date for h in found]
 
     def get_holdings_isil_new_date_date(self, isil, occurrence="01"):
         """
@@ -800,7 +941,10 @@ class PicaJson(SerialJson):
         if new_date is not None:
             dates = []
             for n_date in new_date:
-                dates.append(datetime.datetime.strptime(n_date, "%d-%m-%y").date())
+                if n_date is not None:
+                    dates.append(dateparse.pica_date(n_date))
+                else:
+                    dates.append(None)
             if len(dates) > 0:
                 return dates
 
@@ -815,7 +959,10 @@ class PicaJson(SerialJson):
         if new_date is not None:
             dates = []
             for n_date in new_date:
-                dates.append(n_date.isoformat())
+                if n_date is not None:
+                    dates.append(n_date.isoformat())
+                else:
+                    dates.append(None)
             if len(dates) > 0:
                 return dates
 
@@ -833,15 +980,6 @@ class PicaJson(SerialJson):
         209A/7100: Signatur (Exemplardaten)
           $B    Sigel (nur SWB)
         """
-        index = self.get_holdings_isil_index(isil, occurrence=occurrence)
-        if index is not None:
-            new_key = self.get_holdings_new_key(occurrence=occurrence)
-            if new_key is not None:
-                if len(new_key) == self.get_holdings_isil_count(occurrence=occurrence):
-                    keys = []
-                    for i in index:
-                        keys.append(new_key[i])
-                    if len(keys) > 0:
-                        return keys
-                else:
-                    self.logger.error("Unequal number of holding ISILs and new keys in record {0}".format(self.get_ppn()))
+        found = self._holdings_by("isil", isil, occurrence=occurrence)
+        if found is not None:
+            return [h.new_key for h in found]
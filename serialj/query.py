@@ -0,0 +1,287 @@
+"""
+Query language for selecting PicaJson and MarcJson records
+
+Queries in the style of PICA Path are parsed once and compiled into
+nested closures, which are evaluated directly against the fields of a
+record with short-circuit evaluation, e.g.
+
+    045R$a =^ 'ST'
+    209A/01$B == 'DE-14' && 208@/01$b like 'a*'
+    209A{$B == 'DE-14' && $d != 'z'} || !002@
+    924/0$b == 'DE-14'
+
+A path is a tag with an optional occurrence (PICA) or first indicator
+(MARC) after a slash, e.g. 209A/01, 209A/01-09 or 209A/*. A path without
+subfield checks that the field exists, a path with subfield (045R$a)
+checks that the subfield exists. Subfield values are compared with
+
+    ==   equal           !=   not equal
+    =^   starts with     =$   ends with
+    =?   contains        =~   matches regular expression
+    like matches pattern with wildcards * and ?
+
+A comparison is true if any of the values matches, except != which is
+true if none of the values is equal, i.e. 045R$a != 'ST' is the same as
+!045R$a == 'ST' and also true for records without 045R. Conditions on
+subfields of the same field are grouped in braces, e.g.
+209A{$B == 'DE-14' && $a =^ 'SIG'}, and must hold for one and the same
+field, != within braces refers to the values of that field only. Conditions are combined with
+&& (and), || (or), ! (not) and parentheses.
+"""
+
+import re
+import fnmatch
+
+
+_TOKENS = re.compile(r"""
+    (?P<space>\s+)
+  | (?P<string>'(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*")
+  | (?P<op>==|!=|=\^|=\$|=\?|=~)
+  | (?P<and>&&)
+  | (?P<or>\|\|)
+  | (?P<not>!)
+  | (?P<path>\d{3}[A-Z@]?(?:/(?:\*|\w+(?:-\w+)?))?)
+  | (?P<subfield>\$\s*[0-9A-Za-z@_])
+  | (?P<word>[A-Za-z]+)
+  | (?P<punct>[(){}])
+""", re.VERBOSE)
+
+_WORDS = {
+    "and": "and",
+    "or": "or",
+    "not": "not",
+    "like": "op",
+}
+
+_ESCAPE = re.compile(r"\\(.)")
+
+
+def _tokenize(text):
+    tokens = []
+    pos = 0
+    while pos < len(text):
+        match = _TOKENS.match(text, pos)
+        if match is None:
+            raise ValueError("Invalid query {0!r}: unexpected character at position {1}".format(text, pos))
+        kind = match.lastgroup
+        value = match.group(kind)
+        if kind == "word":
+            if value.lower() not in _WORDS:
+                raise ValueError("Invalid query {0!r}: unexpected word {1} at position {2}".format(text, value, pos))
+            kind = _WORDS[value.lower()]
+            value = value.lower()
+        elif kind == "punct":
+            kind = value
+        elif kind == "string":
+            value = _ESCAPE.sub(r"\1", value[1:-1])
+        elif kind == "subfield":
+            value = value[-1]
+        if kind != "space":
+            tokens.append((kind, value, pos))
+        pos = match.end()
+    tokens.append(("end", None, pos))
+    return tokens
+
+
+def _value_test(op, value):
+    if op == "==":
+        return value.__eq__
+    if op == "=^":
+        return lambda v: v.startswith(value)
+    if op == "=$":
+        return lambda v: v.endswith(value)
+    if op == "=?":
+        return lambda v: value in v
+    if op == "=~":
+        return re.compile(value).search
+    if op == "like":
+        return re.compile(fnmatch.translate(value)).match
+    raise ValueError("Unknown operator {0}".format(op))
+
+
+def _occurrence_test(occurrence):
+    if occurrence is None or occurrence == "*":
+        return None
+    if "-" in occurrence:
+        start, end = occurrence.split("-")
+        return lambda v: v is not None and start <= v <= end and len(v) == len(start)
+    return occurrence.__eq__
+
+
+def _subfield_condition(code, op, value):
+    """
+    Row predicate for subfield with given code (and comparison)
+    """
+    if op is None:
+        def condition(row, skip):
+            for i in range(skip, len(row), 2):
+                if row[i] == code:
+                    return True
+            return False
+    elif op == "!=":
+        def condition(row, skip):
+            for i in range(skip, len(row), 2):
+                if row[i] == code and row[i + 1] == value:
+                    return False
+            return True
+    else:
+        test = _value_test(op, value)
+
+        def condition(row, skip):
+            for i in range(skip, len(row), 2):
+                if row[i] == code and test(row[i + 1]):
+                    return True
+            return False
+    return condition
+
+
+def _field_condition(tag, occurrence, row_condition):
+    """
+    Record predicate for field with given tag, occurrence and row predicate
+    """
+    occurrence_test = _occurrence_test(occurrence)
+
+    def condition(record):
+        rows = record._field_rows(tag)
+        if rows is None:
+            return False
+        skip = record.skip
+        for row in rows:
+            if occurrence_test is not None and not occurrence_test(row[1]):
+                continue
+            if row_condition is None or row_condition(row, skip):
+                return True
+        return False
+    return condition
+
+
+def _and(left, right):
+    return lambda *args: left(*args) and right(*args)
+
+
+def _or(left, right):
+    return lambda *args: left(*args) or right(*args)
+
+
+def _not(operand):
+    return lambda *args: not operand(*args)
+
+
+class _Parser:
+    """
+    Recursive descent parser compiling a query into a record predicate
+    """
+
+    def __init__(self, text):
+        self.text = text
+        self.tokens = _tokenize(text)
+        self.pos = 0
+
+    def peek(self):
+        return self.tokens[self.pos][0]
+
+    def take(self, kind=None):
+        token = self.tokens[self.pos]
+        if kind is not None and token[0] != kind:
+            found = "end of query" if token[0] == "end" else repr(token[1])
+            raise ValueError("Invalid query {0!r}: expected {1} at position {2}, found {3}".format(self.text, kind, token[2], found))
+        self.pos += 1
+        return token
+
+    def parse(self):
+        condition = self.expression(self.field)
+        self.take("end")
+        return condition
+
+    def expression(self, atom):
+        condition = self.conjunction(atom)
+        while self.peek() == "or":
+            self.take()
+            condition = _or(condition, self.conjunction(atom))
+        return condition
+
+    def conjunction(self, atom):
+        condition = self.negation(atom)
+        while self.peek() == "and":
+            self.take()
+            condition = _and(condition, self.negation(atom))
+        return condition
+
+    def negation(self, atom):
+        if self.peek() == "not":
+            self.take()
+            return _not(self.negation(atom))
+        if self.peek() == "(":
+            self.take()
+            condition = self.expression(atom)
+            self.take(")")
+            return condition
+        return atom()
+
+    def comparison(self):
+        if self.peek() == "op":
+            op = self.take()[1]
+            value = self.take("string")[1]
+            return op, value
+        return None, None
+
+    def subfield(self):
+        code = self.take("subfield")[1]
+        op, value = self.comparison()
+        return _subfield_condition(code, op, value)
+
+    def field(self):
+        path = self.take("path")[1]
+        tag, _, occurrence = path.partition("/")
+        if self.peek() == "subfield":
+            code = self.take("subfield")[1]
+            op, value = self.comparison()
+            if op == "!=":
+                # none of the values in any of the fields is equal
+                return _not(_field_condition(tag, occurrence or None, _subfield_condition(code, "==", value)))
+            row_condition = _subfield_condition(code, op, value)
+        elif self.peek() == "{":
+            self.take()
+            row_condition = self.expression(self.subfield)
+            self.take("}")
+        else:
+            row_condition = None
+        return _field_condition(tag, occurrence or None, row_condition)
+
+
+class Query:
+    """
+    Record predicate compiled from query (see serialj.query)
+
+    Calling the query with a record returns whether the record matches.
+    """
+
+    def __init__(self, text):
+        self.text = text
+        self.condition = _Parser(text).parse()
+
+    def __repr__(self):
+        return "Query({0!r})".format(self.text)
+
+    def __call__(self, record):
+        return self.condition(record)
+
+    def filter(self, records):
+        """
+        Yield records matching the query
+        """
+        condition = self.condition
+        for record in records:
+            if condition(record):
+                yield record
+
+
+def compile_query(query):
+    """
+    Compile query unless it is a Query or another callable already
+    """
+    if isinstance(query, str):
+        return Query(query)
+    if callable(query):
+        return query
+    raise ValueError("Invalid query {0!r}. Expected string or callable.".format(query))
@@ -0,0 +1,310 @@
+"""
+Validation of records against Avram schemas
+
+Avram (https://format.gbv.de/schema/avram/specification) schemas define
+the fields of a format with their occurrences, indicators and subfields,
+whether they are required or repeatable and which values are allowed.
+Validation checks that records are well-formed and conform to the schema,
+issues are returned as Issue tuples:
+
+    avram = schema.Schema.load("k10plus.avram.json")
+    records = list(serialj.stream_records("dump.ndjson.gz"))
+    for issue in avram.validate_many(records):
+        print(issue.record, issue.field, issue.subfield, issue.code, issue.message)
+
+Records without issues are marked as trusted, get_field and get_value of
+trusted records skip checks on occurrences, indicators and rows, which are
+verified to be well-formed. Batches are validated field by field: field
+definitions are resolved once per batch and values are checked per
+subfield across all records of the batch.
+"""
+
+import re
+import collections
+
+from .marcjson import BLANK
+from .utils import loads, open_file
+
+
+Issue = collections.namedtuple("Issue", ("record", "field", "subfield", "code", "message"))
+
+# occurrences of PICA fields
+OCCURRENCE = re.compile(r"[0-9]*\Z")
+# indicators of MARC fields
+INDICATOR = re.compile(r"[0-9a-z ]?\Z")
+
+
+class FieldDefinition:
+    """
+    Field definition of an Avram schema prepared for validation
+    """
+
+    def __init__(self, key, definition):
+        self.key = key
+        self.repeatable = definition.get("repeatable", False)
+        self.required = definition.get("required", False)
+        self.indicators = (_codes(definition.get("indicator1")), _codes(definition.get("indicator2")))
+        self.subfields = {}
+        self.required_subfields = []
+        self.tests = {}
+        for code, subfield in (definition.get("subfields") or {}).items():
+            self.subfields[code] = subfield.get("repeatable", False)
+            if subfield.get("required", False):
+                self.required_subfields.append(code)
+            test = _value_test(subfield)
+            if test is not None:
+                self.tests[code] = test
+
+
+def _codes(definition):
+    if isinstance(definition, dict):
+        codes = definition.get("codes")
+        if isinstance(codes, (dict, list)):
+            return set(codes)
+
+
+def _value_test(definition):
+    pattern = definition.get("pattern")
+    codes = _codes(definition)
+    if pattern is not None:
+        search = re.compile(pattern).search
+        if codes is not None:
+            return lambda value: value in codes and search(value) is not None
+        return lambda value: search(value) is not None
+    if codes is not None:
+        return codes.__contains__
+
+
+class Schema:
+    """
+    Avram schema for validating PicaJson and MarcJson records
+
+    Fields not defined in the schema are reported unless ignore_unknown_fields
+    is set, subfields not defined in the schema of their field unless
+    ignore_unknown_subfields is set. With check_values=False, subfield
+    values are not checked against patterns and codes of the schema. Fields
+    and subfields are checked to be well-formed regardless of these options.
+    Repetition of PICA level 1 and 2 fields is checked per level 1 block,
+    required fields are checked for PICA level 0 and all MARC fields.
+    """
+
+    def __init__(self, fields, ignore_unknown_fields=False, ignore_unknown_subfields=False, check_values=True):
+        self.ignore_unknown_fields = ignore_unknown_fields
+        self.ignore_unknown_subfields = ignore_unknown_subfields
+        self.check_values = check_values
+        self.definitions = {}
+        self.ranges = {}
+        self.required = []
+        for key, definition in fields.items():
+            field = FieldDefinition(key, definition)
+            tag, _, occurrence = key.partition("/")
+            if "-" in occurrence:
+                start, end = occurrence.split("-")
+                self.ranges.setdefault(tag, []).append((start, end, field))
+            else:
+                self.definitions[key] = field
+                if field.required and occurrence == "" and not (len(tag) == 4 and tag[0] in "12"):
+                    self.required.append(tag)
+        self._resolved = {}
+        self._valid = {}
+
+    @classmethod
+    def from_dict(cls, schema, **kwargs):
+        """
+        Schema from decoded Avram JSON
+        """
+        return cls(schema.get("fields") or {}, **kwargs)
+
+    @classmethod
+    def load(cls, path, **kwargs):
+        """
+        Schema from (compressed) Avram JSON file at given path
+        """
+        with open_file(path) as f:
+            return cls.from_dict(loads(f.read()), **kwargs)
+
+    def definition(self, tag, occurrence=None):
+        """
+        Definition of field with given tag and occurrence, None if undefined
+        """
+        key = (tag, occurrence)
+        if key not in self._resolved:
+            field = None
+            if occurrence is not None:
+                field = self.definitions.get("{0}/{1}".format(tag, occurrence))
+                if field is None:
+                    for start, end, candidate in self.ranges.get(tag, ()):
+                        if len(start) == len(occurrence) and start <= occurrence <= end:
+                            field = candidate
+                            break
+            if field is None:
+                field = self.definitions.get(tag)
+            self._resolved[key] = field
+        return self._resolved[key]
+
+    def validate(self, record, trust=True):
+        """
+        Validate record and return list of issues (see validate_many)
+        """
+        return self.validate_many([record], trust=trust)
+
+    def validate_many(self, records, trust=True):
+        """
+        Validate batch of records and return list of issues
+
+        Issues refer to records by their position in the batch. With
+        trust=True, records without issues are marked as trusted and all
+        others as not trusted.
+        """
+        records = list(records)
+        issues = []
+        columns = {}
+        tags = []
+        for i, record in enumerate(records):
+            tags.append(self._collect(i, record, columns, issues))
+        for (tag, occurrence), (skip, entries) in columns.items():
+            self._check_field(tag, occurrence, skip, entries, issues)
+        for i, seen in enumerate(tags):
+            if seen is None:
+                continue
+            for tag in self.required:
+                if tag not in seen:
+                    issues.append(Issue(i, tag, None, "missing-field", "Required field {0} not found".format(tag)))
+        issues.sort(key=lambda issue: issue.record)
+        if trust:
+            invalid = set(issue.record for issue in issues)
+            for i, record in enumerate(records):
+                record.trusted = i not in invalid
+        return issues
+
+    def _collect(self, i, record, columns, issues):
+        # check that rows are well-formed and group them by field
+        data = record.data
+        if data is None:
+            issues.append(Issue(i, None, None, "malformed-record", "Record has no data"))
+            return None
+        skip = record.skip
+        pattern = OCCURRENCE if skip == 2 else INDICATOR
+        valid = self._valid.setdefault(skip, set())
+        seen = set()
+        block = 0
+        level = "0"
+        for row in data:
+            if not isinstance(row, list) or len(row) < skip or (len(row) - skip) % 2 != 0 or not isinstance(row[0], str):
+                field = row[0] if isinstance(row, list) and len(row) > 0 and isinstance(row[0], str) else repr(row)
+                issues.append(Issue(i, field, None, "malformed-field", "Field {0} is malformed".format(field)))
+                continue
+            tag = row[0]
+            if not _valid_head(row[1], pattern, valid) or (skip == 3 and not _valid_head(row[2], pattern, valid)):
+                issues.append(Issue(i, tag, None, "malformed-field", "Field {0} has invalid {1}".format(tag, "occurrence" if skip == 2 else "indicators")))
+                continue
+            occurrence = row[1] or None if skip == 2 else None
+            if skip == 2:
+                if tag[:1] == "1" and level != "1":
+                    block += 1
+                level = tag[:1]
+            seen.add(tag)
+            key = (tag, occurrence)
+            if key in columns:
+                columns[key][1].append((i, block, row))
+            else:
+                columns[key] = (skip, [(i, block, row)])
+        return seen
+
+    def _check_field(self, tag, occurrence, skip, entries, issues):
+        field_id = _field_id(tag, occurrence)
+        definition = self.definition(tag, occurrence)
+        if definition is None:
+            for i, block, row in entries:
+                if not self.ignore_unknown_fields:
+                    issues.append(Issue(i, field_id, None, "undefined-field", "Field {0} is not defined".format(field_id)))
+                code = _malformed_subfield(row, skip)
+                if code is not None:
+                    issues.append(_malformed_subfield_issue(i, field_id, code))
+            return
+        if not definition.repeatable:
+            counts = collections.Counter((i, block) for i, block, row in entries)
+            for (i, block), count in counts.items():
+                if count > 1:
+                    issues.append(Issue(i, field_id, None, "nonrepeatable-field",
+                                        "Field {0} is not repeatable. Found {1} occurrences.".format(field_id, count)))
+        subfields = definition.subfields
+        required = definition.required_subfields
+        indicators = definition.indicators
+        values = {code: [] for code in definition.tests} if self.check_values else {}
+        check_indicators = skip == 3 and (indicators[0] is not None or indicators[1] is not None)
+        for i, block, row in entries:
+            if check_indicators:
+                for n, codes in enumerate(indicators, start=1):
+                    value = row[n]
+                    if codes is not None and value not in BLANK and value not in codes:
+                        issues.append(Issue(i, field_id, None, "invalid-indicator",
+                                            "Indicator {0} of field {1} has invalid value {2!r}".format(n, field_id, value)))
+            code = _malformed_subfield(row, skip)
+            if code is not None:
+                issues.append(_malformed_subfield_issue(i, field_id, code))
+                continue
+            counts = {}
+            for j in range(skip, len(row), 2):
+                code = row[j]
+                counts[code] = counts.get(code, 0) + 1
+                if code in values:
+                    values[code].append((i, row[j + 1]))
+            for code, count in counts.items():
+                if code not in subfields:
+                    if not self.ignore_unknown_subfields:
+                        issues.append(Issue(i, field_id, code, "undefined-subfield",
+                                            "Subfield {0} of field {1} is not defined".format(code, field_id)))
+                elif count > 1 and not subfields[code]:
+                    issues.append(Issue(i, field_id, code, "nonrepeatable-subfield",
+                                        "Subfield {0} of field {1} is not repeatable. Found {2} occurrences.".format(code, field_id, count)))
+            for code in required:
+                if code not in counts:
+                    issues.append(Issue(i, field_id, code, "missing-subfield",
+                                        "Required subfield {0} of field {1} not found".format(code, field_id)))
+        for code, found in values.items():
+            test = definition.tests[code]
+            for i, value in found:
+                if not test(value):
+                    issues.append(Issue(i, field_id, code, "invalid-value",
+                                        "Subfield {0} of field {1} has invalid value {2!r}".format(code, field_id, value)))
+
+
+def _field_id(tag, occurrence):
+    if occurrence:
+        return "{0}/{1}".format(tag, occurrence)
+    return tag
+
+
+def _valid_head(value, pattern, valid):
+    # whether occurrence or indicator is valid, valid values are cached
+    if value is None:
+        return True
+    if not isinstance(value, str):
+        return False
+    if value in valid:
+        return True
+    if pattern.match(value):
+        valid.add(value)
+        return True
+    return False
+
+
+def _malformed_subfield(row, skip):
+    # code of first malformed subfield, None if all subfields are well-formed
+    codes = row[skip::2]
+    try:
+        # joining fails for values other than strings
+        "".join(row[skip + 1::2])
+        if len(codes) == 0 or (len("".join(codes)) == len(codes) and max(map(len, codes)) == 1):
+            return None
+    except TypeError:
+        pass
+    for j in range(skip, len(row), 2):
+        code = row[j]
+        if not isinstance(code, str) or len(code) != 1 or not isinstance(row[j + 1], str):
+            return code
+
+
+def _malformed_subfield_issue(i, field_id, code):
+    return Issue(i, field_id, code, "malformed-subfield", "Subfield {0!r} of field {1} is malformed".format(code, field_id))
@@ -1,3 +1,5 @@
+import logging
+
 from .parser import Parser
 
 
@@ -6,10 +8,18 @@ class SerialJson(Parser):
     Generic class for parsing JSON serialized MARC or PICA data
     """
 
-    def __init__(self, data, skip=1, name=None, level=None):
-        super().__init__(data, name=name, level=level)
-        self.idx = self._indices()
+    __slots__ = ("idx", "skip", "subidx", "trusted")
+
+    def __init__(self, data, skip=1, name=None, level=None, subfield_index=False, diagnostics=None, idx=None):
+        super().__init__(data, name=name, level=level, diagnostics=diagnostics)
+        # a precomputed index of field positions can be passed to skip indexing
+        self.idx = self._indices() if idx is None else idx
         self.skip = skip
+        # values of fields and subfields looked up by get_value, see _index_values
+        self.subidx = {} if subfield_index else None
+        # set by serialj.schema for records validated against a schema,
+        # getters then skip checks on occurrences, indicators and rows
+        self.trusted = False
 
     def _indices(self):
         indices = {}
@@ -25,6 +35,22 @@ class SerialJson(Parser):
         if name in self.idx:
             return self.idx[name]
 
+    def _field_rows(self, name):
+        positions = self._field_pos(name)
+        if positions is not None:
+            return [self.data[i] for i in positions]
+
+    def _subfield_values(self, name, subf):
+        values = []
+        rows = self._field_rows(name)
+        if rows is not None:
+            for row in rows:
+                pos = self._subfield_pos(row, subf)
+                if pos is not None:
+                    for p in pos:
+                        values.append(row[p])
+        return values
+
     def _subfield_pos(self, row, subf):
         positions = []
         for i in range(self.skip, len(row), 2):
@@ -43,9 +69,57 @@ class SerialJson(Parser):
                     if all(len(row[p]) == 1 for p in pos):
                         return [row[p][0] for p in pos]
                     else:
-                        self.logger.warning("Expected unrepeated subfield {0} in field {1}. Found mutiple occurrences.".format(subfield, row[0]))
+                        self._report(logging.WARNING, "Expected unrepeated subfield %s in field %s. Found mutiple occurrences.", subfield, row[0])
                 return [row[p] for p in pos]
 
+    def _index_values(self, key, rows):
+        # collect values of a subfield per row once for the subfield index,
+        # key is (field, subfield, occurrence or indicators), rows without
+        # the subfield get an empty value as with get_value. Entries hold
+        # the single values of rows or, if any row repeats the subfield,
+        # the lists of values per row.
+        if rows is None:
+            return None
+        subfield = key[1]
+        first = []
+        for i, row in enumerate(rows):
+            pos = self._subfield_pos(row, subfield)
+            if pos is None:
+                first.append("")
+            elif len(pos) == 1:
+                first.append(row[pos[0]])
+            else:
+                break
+        else:
+            entry = self.subidx[key] = (None, first)
+            return entry
+        found = [[value] for value in first]
+        for row in rows[i:]:
+            pos = self._subfield_pos(row, subfield)
+            if pos is not None:
+                found.append([row[p] for p in pos])
+            else:
+                found.append([""])
+        entry = self.subidx[key] = (found, None)
+        return entry
+
+    def _value_from_index(self, key, entry, repeat=True, collapse=False):
+        # same as _value_from_rows for values collected by _index_values,
+        # returned lists are copies, so callers cannot change the index
+        found, first = entry
+        if first is not None:
+            if collapse:
+                return "||".join(first)
+            if not repeat:
+                return list(first)
+            return [[value] for value in first]
+        if collapse:
+            return "||".join("|".join(sbf) for sbf in found)
+        if not repeat:
+            self._report(logging.WARNING, "Expected unrepeated subfield %s in field %s. Found mutiple occurrences.", key[1], key[0])
+            return [sbf[0] for sbf in found]
+        return [list(sbf) for sbf in found]
+
     def _value_from_rows(self, rows, subfield, repeat=True, collapse=False, preserve=True):
         found = []
         for row in rows:
@@ -64,8 +138,8 @@ class SerialJson(Parser):
                 return "||".join(found)
             if not repeat:
                 if not all(len(sbf) == 1 for sbf in found):
-                    self.logger.warning("Expected unrepeated subfield {0} in field {1}. Found mutiple occurrences.".format(subfield, rows[0][0]))
+                    self._report(logging.WARNING, "Expected unrepeated subfield %s in field %s. Found mutiple occurrences.", subfield, rows[0][0])
                 return [sbf[0] for sbf in found]
             return found
         else:
-            self.logger.error("Subfield {0} not found in field {1}!".format(subfield, rows[0][0]))
+            self._report(logging.ERROR, "Subfield %s not found in field %s!", subfield, rows[0][0])
@@ -0,0 +1,102 @@
+import logging
+
+from .utils import loads, open_file, set_stream, BUFFER_SIZE
+from .compact import CompactMarcJson, CompactPicaJson
+from .lazy import LazyMarcJson, LazyPicaJson
+from .marcjson import MarcJson
+from .picajson import PicaJson
+from .query import compile_query
+
+
+logger = logging.getLogger(__name__)
+set_stream(logger)
+
+FORMATS = {
+    "pica": PicaJson,
+    "picajson": PicaJson,
+    "marc": MarcJson,
+    "marcjson": MarcJson,
+}
+
+LAZY_FORMATS = {
+    PicaJson: LazyPicaJson,
+    MarcJson: LazyMarcJson,
+}
+
+COMPACT_FORMATS = {
+    PicaJson: CompactPicaJson,
+    MarcJson: CompactMarcJson,
+}
+
+
+def record_class(format, lazy=False, compact=False):
+    """
+    Get record class for given format name (pica or marc)
+    """
+    if lazy and compact:
+        raise ValueError("Records cannot be both lazy and compact")
+    try:
+        cls = FORMATS[format.lower()]
+    except (AttributeError, KeyError):
+        raise ValueError("Unknown record format {0}. Expected one of: {1}".format(format, ", ".join(FORMATS)))
+    if lazy:
+        return LAZY_FORMATS[cls]
+    if compact:
+        return COMPACT_FORMATS[cls]
+    return cls
+
+
+def stream_lines(path, buffering=BUFFER_SIZE):
+    """
+    Yield non-empty lines of (compressed) NDJSON file at given path
+    """
+    with open_file(path, buffering=buffering) as f:
+        for line in f:
+            if line.strip():
+                yield line
+
+
+def stream_records(path, format="pica", lazy=False, compact=False, buffering=BUFFER_SIZE, where=None, **kwargs):
+    """
+    Yield records of (compressed) NDJSON file at given path one by one
+
+    With lazy=True, records are created from the raw lines and only decoded
+    as far as needed (see serialj.lazy). With compact=True, records are kept
+    in a compact representation (see serialj.compact). With where, only
+    records matching the given query (see serialj.query) or predicate are
+    yielded. Queries are evaluated on lazy records, so non-matching records
+    are dropped without decoding them completely. Additional keyword
+    arguments are passed to the record class.
+    """
+    if where is not None:
+        yield from _stream_matching(path, format, lazy, compact, buffering, compile_query(where), kwargs)
+        return
+    if lazy:
+        cls = record_class(format, lazy=True)
+        for line in stream_lines(path, buffering=buffering):
+            yield cls(line, **kwargs)
+        return
+    cls = record_class(format, compact=compact)
+    for i, line in enumerate(stream_lines(path, buffering=buffering), start=1):
+        try:
+            data = loads(line)
+        except ValueError as err:
+            logger.error("Skipping invalid record {0} in file {1}: {2}".format(i, path, err))
+            continue
+        yield cls(data, **kwargs)
+
+
+def _stream_matching(path, format, lazy, compact, buffering, condition, kwargs):
+    lazy_cls = record_class(format, lazy=True)
+    cls = record_class(format, compact=compact)
+    for i, line in enumerate(stream_lines(path, buffering=buffering), start=1):
+        record = lazy_cls(line, **kwargs)
+        try:
+            if not condition(record):
+                continue
+            if not lazy:
+                record = cls(record.data, **kwargs)
+        except ValueError as err:
+            logger.error("Skipping invalid record {0} in file {1}: {2}".format(i, path, err))
+            continue
+        yield record
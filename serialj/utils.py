@@ -1,7 +1,13 @@
+import io
+import bz2
+import gzip
 import json
 import logging
 
 
+BUFFER_SIZE = 1024 * 1024
+
+
 def set_stream(logger, level=None):
     """
     Create log stream, format output and set level
@@ -19,19 +25,145 @@ logger = logging.getLogger(__name__)
 set_stream(logger)
 
 
+JSON_BACKENDS = ("orjson", "msgspec", "ujson", "json")
+
+_json_backend = None
+_json_loads = None
+_json_dumps = None
+_json_pretty = None
+
+
+def _dumps(data):
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _import_backend(name):
+    """
+    Import JSON backend with given name and return its loads, compact dumps
+    (to bytes) and pretty dumps functions
+    """
+    if name == "orjson":
+        import orjson
+
+        def dumps(data):
+            try:
+                return orjson.dumps(data)
+            except TypeError:
+                return _dumps(data)
+
+        def pretty(data):
+            try:
+                return orjson.dumps(data, option=orjson.OPT_INDENT_2).decode("utf-8")
+            except TypeError:  # e.g. non-string keys or big integers
+                return json.dumps(data, ensure_ascii=False, indent=2)
+        return orjson.loads, dumps, pretty
+    if name == "msgspec":
+        import msgspec
+        decoder = msgspec.json.Decoder()
+
+        def decode(data):
+            try:
+                return decoder.decode(data)
+            except msgspec.DecodeError as err:
+                raise ValueError(str(err))
+        return decode, msgspec.json.encode, None
+    if name == "ujson":
+        import ujson
+        return ujson.loads, _dumps, None
+    if name == "json":
+        return json.loads, _dumps, None
+    raise ValueError("Unknown JSON backend {0}. Expected one of: {1}".format(name, ", ".join(JSON_BACKENDS)))
+
+
+def set_json_backend(name=None):
+    """
+    Set JSON backend (orjson, msgspec, ujson or json)
+
+    Without a name, the first installed backend is chosen.
+    """
+    global _json_backend, _json_loads, _json_dumps, _json_pretty
+    names = JSON_BACKENDS if name is None else (name,)
+    for candidate in names:
+        try:
+            _json_loads, _json_dumps, _json_pretty = _import_backend(candidate)
+        except ImportError:
+            if name is not None:
+                raise
+            continue
+        _json_backend = candidate
+        return candidate
+
+
+def json_backend():
+    """
+    Name of the JSON backend in use
+    """
+    return _json_backend
+
+
+def loads(data):
+    """
+    Decode JSON string or bytes with the configured backend
+    """
+    return _json_loads(data)
+
+
+def dumps(data):
+    """
+    Encode data as compact JSON bytes with the configured backend
+    """
+    return _json_dumps(data)
+
+
+set_json_backend()
+
+
 def read_json(path):
     """
     Read JSON file at given path
     """
     try:
-        with open(path) as f:
-            return json.load(f)
+        with open(path, "rb") as f:
+            return loads(f.read())
     except Exception as err:
         logger.error(err)
 
 
+def _compression(path):
+    with open(path, "rb") as f:
+        magic = f.read(3)
+    if magic[:2] == b"\x1f\x8b":
+        return "gzip"
+    if magic == b"BZh":
+        return "bz2"
+
+
+def is_compressed(path):
+    """
+    Check whether file at given path is compressed (gzip, bz2)
+    """
+    return _compression(path) is not None
+
+
+def open_file(path, buffering=BUFFER_SIZE):
+    """
+    Open file at given path for buffered binary reading
+
+    Compressed files (gzip, bz2) are detected by their magic bytes
+    and decompressed transparently.
+    """
+    compression = _compression(path)
+    if compression == "gzip":
+        return io.BufferedReader(gzip.GzipFile(path, "rb"), buffer_size=buffering)
+    if compression == "bz2":
+        return io.BufferedReader(bz2.BZ2File(path, "rb"), buffer_size=buffering)
+    return open(path, "rb", buffering=buffering)
+
+
 def pretty_json(data):
     """
     Create a pretty formatted JSON string.
     """
+    if _json_pretty is not None:
+        return _json_pretty(data)
     return json.dumps(data, ensure_ascii=False, indent=2)
@@ -0,0 +1,257 @@
+"""
+Streaming writers for PICA JSON, MARC JSON, PICA Plain and normalized PICA
+
+Writers take PicaJson/MarcJson records (or their data) one by one and
+write them buffered, so filter-and-rewrite pipelines built on the
+streaming readers keep only one batch of serialized records in memory:
+
+    with writer.NdjsonWriter("filtered.ndjson.gz") as out:
+        out.write_many(serialj.stream_records("dump.ndjson.gz", lazy=True, where="045R$a =^ 'ST'"))
+
+Output paths ending with .gz or .bz2 are compressed, file objects opened
+for binary writing can be given instead of a path. PICA Plain and
+normalized PICA cannot represent values containing line breaks (or
+separators of normalized PICA), writing such values raises ValueError.
+"""
+
+import re
+import bz2
+import gzip
+
+from .lazy import LazyRecord
+from .marcjson import MarcJson
+from .serialj import SerialJson
+from .utils import dumps, BUFFER_SIZE
+
+
+BATCH_SIZE = 1000
+
+FIELD_SEPARATOR = "\x1e"
+SUBFIELD_SEPARATOR = "\x1f"
+
+_PLAIN_SUBFIELD = re.compile(r"\$([^$])((?:[^$]|\$\$)*)")
+# characters which cannot be written in values
+_PLAIN_INVALID = re.compile("[\n\r]")
+_NORMALIZED_INVALID = re.compile("[\n\r\x1e\x1f]")
+
+
+def _open(path):
+    path = str(path)
+    if path.endswith(".gz"):
+        return gzip.open(path, "wb")
+    if path.endswith(".bz2"):
+        return bz2.open(path, "wb")
+    return open(path, "wb", buffering=BUFFER_SIZE)
+
+
+class RecordWriter:
+    """
+    Generic writer of records, serialized records are written in batches
+    """
+
+    def __init__(self, path, batch_size=BATCH_SIZE):
+        if hasattr(path, "write"):
+            self.file = path
+            self.owned = False
+        else:
+            self.file = _open(path)
+            self.owned = True
+        self.batch_size = batch_size
+        self.buffer = []
+        self.count = 0
+
+    def _serialize(self, record):
+        raise NotImplementedError
+
+    def write(self, record):
+        """
+        Write record (PicaJson/MarcJson or its data)
+        """
+        self.buffer.append(self._serialize(record))
+        self.count += 1
+        if len(self.buffer) >= self.batch_size:
+            self.flush()
+
+    def write_many(self, records):
+        """
+        Write each of given records and return the number of written records
+        """
+        for record in records:
+            self.write(record)
+        return self.count
+
+    def flush(self):
+        """
+        Write buffered records
+        """
+        if len(self.buffer) > 0:
+            self.file.write(b"".join(self.buffer))
+            self.buffer = []
+
+    def close(self):
+        """
+        Write buffered records and close output file
+        """
+        self.flush()
+        if self.owned:
+            self.file.close()
+        else:
+            self.file.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def _rows(record):
+    if isinstance(record, SerialJson):
+        return record.data
+    return record
+
+
+def _pica_rows(record):
+    if isinstance(record, MarcJson):
+        raise ValueError("Cannot write MARC record {0} as PICA".format(record.get_ppn()))
+    return _rows(record)
+
+
+def _check_value(row, i, invalid, format):
+    if invalid.search(row[i + 1]) is not None:
+        raise ValueError("Cannot write value {0!r} of subfield {1} in field {2} as {3}".format(row[i + 1], row[i], row[0], format))
+
+
+def _pica_head(row):
+    if row[1]:
+        return "{0}/{1}".format(row[0], row[1])
+    return row[0]
+
+
+class NdjsonWriter(RecordWriter):
+    """
+    Write records as newline-delimited PICA JSON or MARC JSON
+
+    Lazy records which have not been decoded are written as they were read,
+    unless their raw JSON spans multiple lines.
+    """
+
+    def _serialize(self, record):
+        if isinstance(record, LazyRecord) and not record.decoded:
+            raw = record._raw
+            if isinstance(raw, str):
+                raw = raw.encode("utf-8")
+            raw = raw.strip()
+            # raw JSON spanning multiple lines is encoded again
+            if b"\n" not in raw:
+                return raw + b"\n"
+        rows = _rows(record)
+        if not isinstance(rows, list):
+            rows = list(rows)
+        return dumps(rows) + b"\n"
+
+
+class PicaPlainWriter(RecordWriter):
+    """
+    Write PICA records as PICA Plain (http://format.gbv.de/pica/plain)
+
+    Each field is written on its own line, records are separated by an
+    empty line. Dollar signs in values are escaped as $$, values containing
+    line breaks raise ValueError.
+    """
+
+    def _serialize(self, record):
+        parts = []
+        for row in _pica_rows(record):
+            parts.append(_pica_head(row))
+            parts.append(" ")
+            for i in range(2, len(row) - 1, 2):
+                _check_value(row, i, _PLAIN_INVALID, "PICA Plain")
+                parts.append("$")
+                parts.append(row[i])
+                parts.append(row[i + 1].replace("$", "$$"))
+            parts.append("\n")
+        parts.append("\n")
+        return "".join(parts).encode("utf-8")
+
+
+class PicaNormalizedWriter(RecordWriter):
+    """
+    Write PICA records as normalized PICA+ (http://format.gbv.de/pica/normalized)
+
+    Fields end with an information separator (0x1E), subfields start with
+    a unit separator (0x1F), each record is written on its own line.
+    Values containing line breaks or separators raise ValueError.
+    """
+
+    def _serialize(self, record):
+        parts = []
+        for row in _pica_rows(record):
+            parts.append(_pica_head(row))
+            parts.append(" ")
+            for i in range(2, len(row) - 1, 2):
+                _check_value(row, i, _NORMALIZED_INVALID, "normalized PICA")
+                parts.append(SUBFIELD_SEPARATOR)
+                parts.append(row[i])
+                parts.append(row[i + 1])
+            parts.append(FIELD_SEPARATOR)
+        parts.append("\n")
+        return "".join(parts).encode("utf-8")
+
+
+WRITERS = {
+    "ndjson": NdjsonWriter,
+    "json": NdjsonWriter,
+    "plain": PicaPlainWriter,
+    "normalized": PicaNormalizedWriter,
+}
+
+
+def write_records(records, path, format="ndjson", batch_size=BATCH_SIZE):
+    """
+    Write records to file at given path in given format (ndjson, plain or
+    normalized) and return the number of written records
+    """
+    try:
+        cls = WRITERS[format]
+    except KeyError:
+        raise ValueError("Unknown output format {0}. Expected one of: {1}".format(format, ", ".join(WRITERS)))
+    with cls(path, batch_size=batch_size) as writer:
+        return writer.write_many(records)
+
+
+def _pica_row(head, subfields):
+    tag, _, occurrence = head.partition("/")
+    row = [tag, occurrence]
+    for code, value in subfields:
+        row.append(code)
+        row.append(value)
+    return row
+
+
+def parse_plain(text):
+    """
+    Parse PICA Plain record to PICA JSON data
+    """
+    data = []
+    for line in text.split("\n"):
+        if line.strip() == "":
+            continue
+        head, _, rest = line.partition(" ")
+        subfields = [(m.group(1), m.group(2).replace("$$", "$")) for m in _PLAIN_SUBFIELD.finditer(rest)]
+        data.append(_pica_row(head, subfields))
+    return data
+
+
+def parse_normalized(line):
+    """
+    Parse normalized PICA+ record to PICA JSON data
+    """
+    data = []
+    for field in line.rstrip("\n").split(FIELD_SEPARATOR):
+        if field == "":
+            continue
+        head, _, rest = field.partition(" ")
+        subfields = [(s[0], s[1:]) for s in rest.split(SUBFIELD_SEPARATOR)[1:]]
+        data.append(_pica_row(head, subfields))
+    return data
@@ -4,7 +4,7 @@ import setuptools
 
 setuptools.setup(
     name="serialj",
-    version="0.2.16",
+    version="0.3.0",
     author="Donatus Herre",
     author_email="donatus.herre@slub-dresden.de",
     description="Parse JSON serialized MARC and PICA data",
@@ -12,4 +12,9 @@ setuptools.setup(
     url="https://github.com/herreio/serialj",
     packages=["serialj"],
     install_requires=["python-dateutil"],
+    extras_require={
+        "client": ["aiohttp"],
+        "numpy": ["numpy"],
+        "parquet": ["pyarrow"],
+    },
 )
@@ -0,0 +1,45 @@
+import datetime
+
+from serialj import MarcJson, PicaJson
+from serialj import cache
+
+
+PICA = [
+    ["003@", "", "0", "123456789"],
+    ["001B", "", "0", "1999:10-06-20", "t", "11:00:33.000"],
+]
+
+MARC = [
+    ["001", "", "", "_", "123456789"],
+    ["005", "", "", "_", "20200610110033.0"],
+]
+
+
+def test_change_datetime():
+    changed = datetime.datetime(2020, 6, 10, 11, 0, 33)
+    assert cache.change_datetime(PicaJson(PICA)) == changed
+    assert cache.change_datetime(MarcJson(MARC)) == changed
+
+
+def test_change_datetime_missing():
+    assert cache.change_datetime(PicaJson(PICA[:1])) is None
+    assert cache.change_datetime(PicaJson(PICA[:1] + [["001B", "", "0", "10-06-20"]])) is None
+    assert cache.change_datetime(MarcJson(MARC[:1])) is None
+
+
+def test_put_without_latest_change():
+    records = cache.RecordCache(ttl=60, max_ttl=3600)
+    record = PicaJson(PICA[:1])
+    records.put(record)
+    assert records.get("123456789") is record
+    assert records.record_ttl(record) == 60
+    records.put(MarcJson(MARC[:1]))
+    assert "123456789" in records
+
+
+def test_put_with_latest_change():
+    records = cache.RecordCache(ttl=60, max_ttl=3600)
+    record = PicaJson(PICA)
+    assert records.record_ttl(record) == 3600
+    records.put(record)
+    assert records.get("123456789") is record
@@ -0,0 +1,73 @@
+import json
+import asyncio
+
+import pytest
+
+from serialj import client
+
+web = pytest.importorskip("aiohttp.web")
+
+
+RECORDS = {ppn: [["003@", "", "0", ppn]] for ppn in ("1", "2", "3", "4")}
+
+# status of first request per PPN, later requests succeed (or 404)
+STATUS = {"2": 503, "5": 403, "6": 500, "7": 200}
+
+
+async def _serve(handler, tests):
+    app = web.Application()
+    app.router.add_get("/", handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = runner.addresses[0][1]
+    try:
+        return await tests("http://127.0.0.1:{0}/".format(port))
+    finally:
+        await runner.cleanup()
+
+
+def _handler(requests):
+    async def handler(request):
+        ppn = request.query["id"].split(":")[-1]
+        requests.append(ppn)
+        if ppn == "7":
+            return web.Response(body=b"{", content_type="application/json")
+        if ppn == "6" or (requests.count(ppn) == 1 and ppn in STATUS):
+            return web.Response(status=STATUS[ppn])
+        if ppn not in RECORDS:
+            return web.Response(status=404)
+        return web.Response(body=json.dumps(RECORDS[ppn]), content_type="application/json")
+    return handler
+
+
+def test_fetch_many_skips_failures():
+    requests = []
+
+    async def tests(url):
+        async with client.UnapiClient(url=url, retries=2, backoff=0.01) as unapi:
+            ppns = [record.get_ppn() async for record in unapi.fetch_many(["1", "2", "5", "6", "7", "8", "3", "4"])]
+            return ppns, unapi.failures
+
+    ppns, failures = asyncio.run(_serve(_handler(requests), tests))
+    assert sorted(ppns) == ["1", "2", "3", "4"]
+    assert sorted(failures) == ["5", "6", "7"]
+    assert "HTTP status 403" in str(failures["5"])
+    assert "HTTP status 500" in str(failures["6"])
+    assert isinstance(failures["7"], ValueError)
+    # retried: 2 once, 6 twice, not retried: 5 (403), 8 (404)
+    assert requests.count("2") == 2
+    assert requests.count("6") == 3
+    assert requests.count("5") == 1
+    assert requests.count("8") == 1
+
+
+def test_fetch_raw_raises_on_failure():
+    async def tests(url):
+        async with client.UnapiClient(url=url, retries=0) as unapi:
+            assert await unapi.fetch_raw("8") is None
+            with pytest.raises(IOError):
+                await unapi.fetch_raw("5")
+
+    asyncio.run(_serve(_handler([]), tests))
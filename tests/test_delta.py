@@ -0,0 +1,95 @@
+import json
+
+from serialj import delta
+
+
+def _pica(ppn, changed="10-06-20", holdings=()):
+    data = [["003@", "", "0", ppn], ["001B", "", "0", "1999:" + changed, "t", "11:00:33.000"], ["101@", "", "a", "20"]]
+    for i, (epn, holding_changed) in enumerate(holdings, start=1):
+        occurrence = "{0:02d}".format(i)
+        data.append(["201B", occurrence, "0", holding_changed, "t", "08:00:00.000"])
+        data.append(["203@", occurrence, "0", epn])
+    return data
+
+
+def _marc(ppn, changed="20200610110033.0", isil=()):
+    data = [["001", None, None, "_", ppn], ["005", None, None, "_", changed]]
+    for i, code in enumerate(isil):
+        data.append(["924", "0", " ", "a", "{0}{1}".format(ppn, i), "b", code])
+    return data
+
+
+def _write(path, records):
+    with open(path, "w") as f:
+        for record in records:
+            f.write(json.dumps(record) + "\n")
+    return str(path)
+
+
+def _changes(processor, path):
+    return sorted(((change.action, change.ppn, change.epn) for change in processor.process(path)), key=lambda change: (change[0], change[1], change[2] or ""))
+
+
+def _count_digests(monkeypatch):
+    calls = []
+    digest = delta.digest
+    monkeypatch.setattr(delta, "digest", lambda raw: calls.append(raw) or digest(raw))
+    return calls
+
+
+def test_pica_changes(tmp_path, monkeypatch):
+    state = str(tmp_path / "state.tsv.gz")
+    dump = tmp_path / "dump.ndjson"
+    processor = delta.DeltaProcessor(state)
+    records = [_pica("1", holdings=[("10", "01-06-20")]), _pica("2"), _pica("3", holdings=[("30", "01-06-20")])]
+    assert _changes(processor, _write(dump, records)) == [
+        ("new", "1", None), ("new", "1", "10"), ("new", "2", None), ("new", "3", None), ("new", "3", "30")]
+    processor.save()
+    processor = delta.DeltaProcessor(state)
+    calls = _count_digests(monkeypatch)
+    # holding change without title change, new holding, deleted record
+    records = [_pica("1", holdings=[("10", "02-06-20")]), _pica("3", holdings=[("30", "01-06-20"), ("31", "02-06-20")])]
+    assert _changes(processor, _write(dump, records)) == [
+        ("changed", "1", None), ("changed", "1", "10"), ("changed", "3", None), ("deleted", "2", None), ("new", "3", "31")]
+    assert len(calls) == 2
+    del calls[:]
+    assert _changes(processor, _write(dump, records)) == []
+    assert len(calls) == 0
+    assert processor.counts["unchanged"] == 2
+
+
+def test_marc_changes(tmp_path, monkeypatch):
+    state = str(tmp_path / "state.tsv.gz")
+    dump = tmp_path / "dump.ndjson"
+    processor = delta.DeltaProcessor(state, format="marc")
+    records = [_marc("1", isil=["DE-14"]), _marc("2")]
+    assert len(_changes(processor, _write(dump, records))) == 3
+    processor.save()
+    processor = delta.DeltaProcessor(state, format="marc")
+    calls = _count_digests(monkeypatch)
+    records = [_marc("1", isil=["DE-15"]), _marc("2", changed="20210610110033.0")]
+    assert _changes(processor, _write(dump, records)) == [("changed", "1", None), ("changed", "1", "10"), ("changed", "2", None)]
+    assert len(calls) == 2
+    del calls[:]
+    assert _changes(processor, _write(dump, records)) == []
+    assert len(calls) == 0
+
+
+def test_record_without_stamp_is_hashed(tmp_path, monkeypatch):
+    dump = _write(tmp_path / "dump.ndjson", [[["003@", "", "0", "1"]]])
+    processor = delta.DeltaProcessor(str(tmp_path / "state.tsv.gz"))
+    assert _changes(processor, dump) == [("new", "1", None)]
+    calls = _count_digests(monkeypatch)
+    assert _changes(processor, dump) == []
+    assert len(calls) == 1
+
+
+def test_saved_state_is_compact(tmp_path):
+    state = str(tmp_path / "state.tsv.gz")
+    processor = delta.DeltaProcessor(state, format="marc")
+    list(processor.process(_write(tmp_path / "dump.ndjson", [_marc("1", isil=["DE-14"])])))
+    processor.save()
+    saved = delta.ChangeState(state).get("1")
+    assert saved == processor.state.get("1")
+    assert len(saved.digest) == 8
+    assert [len(stamp) for stamp in saved.holdings.values()] == [4]
@@ -0,0 +1,74 @@
+import json
+
+import pytest
+
+from serialj import dumpindex
+
+
+RECORDS = [
+    [["003@", "", "0", "1"], ["203@", "01", "0", "10"], ["203@", "02", "0", "11"]],
+    [["003@", "", "0", "2"], ["203@", "01", "0", "11"]],
+]
+
+
+def _dump(tmp_path, records):
+    path = str(tmp_path / "dump.ndjson")
+    with open(path, "w") as f:
+        for record in records:
+            f.write(json.dumps(record) + "\n")
+    return path
+
+
+def test_indexed_dump(tmp_path):
+    path = _dump(tmp_path, RECORDS)
+    assert dumpindex.build_index(path, keys={"epn": ("203@", "0")}) == 2
+    with dumpindex.IndexedDump(path) as dump:
+        assert len(dump) == 2
+        assert "2" in dump and "3" not in dump
+        assert dump.get("2").data == RECORDS[1]
+        assert dump.get("3") is None
+        assert sorted(record.get_ppn() for record in dump.lookup("epn", "11")) == ["1", "2"]
+
+
+def test_empty_dump(tmp_path):
+    path = _dump(tmp_path, [])
+    assert dumpindex.build_index(path, keys={"epn": ("203@", "0")}) == 0
+    with dumpindex.IndexedDump(path) as dump:
+        assert len(dump) == 0
+        assert "1" not in dump
+        assert dump.get("1") is None
+        assert dump.lookup("epn", "10") == []
+
+
+@pytest.mark.parametrize("index", [b"", b"XXXX" + bytes(20)])
+def test_invalid_index_closes_files(tmp_path, monkeypatch, index):
+    path = _dump(tmp_path, RECORDS)
+    with open(dumpindex.index_path_for(path), "wb") as f:
+        f.write(index)
+    opened = []
+
+    def tracking_open(*args, **kwargs):
+        f = open(*args, **kwargs)
+        opened.append(f)
+        return f
+
+    monkeypatch.setattr(dumpindex, "open", tracking_open, raising=False)
+    with pytest.raises(ValueError):
+        dumpindex.IndexedDump(path)
+    assert len(opened) == 2
+    assert all(f.closed for f in opened)
+
+
+def test_missing_index_closes_dump(tmp_path, monkeypatch):
+    path = _dump(tmp_path, RECORDS)
+    opened = []
+
+    def tracking_open(*args, **kwargs):
+        f = open(*args, **kwargs)
+        opened.append(f)
+        return f
+
+    monkeypatch.setattr(dumpindex, "open", tracking_open, raising=False)
+    with pytest.raises(IOError):
+        dumpindex.IndexedDump(path)
+    assert len(opened) == 1 and opened[0].closed
@@ -0,0 +1,68 @@
+import datetime
+
+import pytest
+
+from serialj import MarcJson, export
+
+pyarrow = pytest.importorskip("pyarrow")
+pyarrow.parquet = pytest.importorskip("pyarrow.parquet")
+
+
+def _record(ppn, changed=None, isil=()):
+    data = [["001", None, None, "_", ppn]]
+    if changed is not None:
+        data.append(["005", None, None, "_", changed])
+    for i, code in enumerate(isil):
+        data.append(["924", "0", " ", "a", "{0}{1}".format(ppn, i), "b", code])
+    return MarcJson(data, diagnostics="count")
+
+
+COLUMNS = {"ppn": "get_ppn", "changed": "get_latest_trans_datetime", "isil": "get_holdings_isil"}
+
+# first batch has neither change dates nor holdings
+RECORDS = [
+    ("1", None, ()),
+    ("2", None, ()),
+    ("3", "20210704133905.0", ("DE-14",)),
+    ("4", None, ("DE-14", "DE-15")),
+]
+
+
+def test_parquet_types_from_first_values(tmp_path):
+    path = str(tmp_path / "titles.parquet")
+    holdings = str(tmp_path / "holdings.parquet")
+    records = [_record(*values) for values in RECORDS]
+    assert export.export(records, path, COLUMNS, holdings=holdings, batch_size=2) == 4
+    table = pyarrow.parquet.read_table(path)
+    assert pyarrow.types.is_timestamp(table.schema.field("changed").type)
+    assert table.column("changed").to_pylist() == [None, None, datetime.datetime(2021, 7, 4, 13, 39, 5), None]
+    assert table.column("isil").to_pylist() == [None, None, ["DE-14"], ["DE-14", "DE-15"]]
+    assert pyarrow.parquet.read_table(holdings).column("epn").to_pylist() == ["30", "40", "41"]
+
+
+def test_parquet_null_column_written_as_string(tmp_path):
+    path = str(tmp_path / "titles.parquet")
+    export.export([_record("1"), _record("2")], path, COLUMNS, batch_size=1)
+    schema = pyarrow.parquet.read_schema(path)
+    assert schema.field("changed").type == pyarrow.string()
+
+
+def test_parquet_schema(tmp_path):
+    path = str(tmp_path / "titles.parquet")
+    schema = {"changed": pyarrow.timestamp("ms"), "isil": pyarrow.list_(pyarrow.string())}
+    original = export.MAX_PENDING
+    export.MAX_PENDING = 1
+    try:
+        export.export([_record(*values) for values in RECORDS], path, COLUMNS, batch_size=1, schema=schema)
+    finally:
+        export.MAX_PENDING = original
+    table = pyarrow.parquet.read_table(path)
+    assert table.schema.field("changed").type == pyarrow.timestamp("ms")
+    assert table.column("isil").to_pylist()[3] == ["DE-14", "DE-15"]
+
+
+def test_parquet_mismatching_types(tmp_path):
+    path = str(tmp_path / "titles.parquet")
+    records = [_record(*values) for values in RECORDS]
+    with pytest.raises(ValueError):
+        export.export(records, path, COLUMNS, batch_size=1, schema={"changed": pyarrow.int64()})
@@ -0,0 +1,52 @@
+import datetime
+
+from serialj import PicaJson
+
+
+# second holding (ILN 21, ISIL DE-2) has neither 201B nor 208@
+RECORD = [
+    ["003@", "", "0", "123456789"],
+    ["101@", "", "a", "20"],
+    ["201B", "01", "0", "10-06-20", "t", "11:00:33.000"],
+    ["201D", "01", "0", "2000:20-05-19"],
+    ["203@", "01", "0", "500000"],
+    ["208@", "01", "a", "10-02-19", "b", "a0"],
+    ["209A", "01", "B", "DE-14", "a", "SIG 0"],
+    ["101@", "", "a", "21"],
+    ["201D", "01", "0", "2100:21-05-19"],
+    ["203@", "01", "0", "500001"],
+    ["209A", "01", "B", "DE-2", "a", "SIG 1"],
+]
+
+CHANGED = datetime.datetime(2020, 6, 10, 11, 0, 33)
+
+
+def test_holding_without_latest_change():
+    record = PicaJson(RECORD)
+    assert record.get_holdings_isil_latest_change_datetime("DE-14") == [CHANGED]
+    assert record.get_holdings_isil_latest_change_datetime("DE-2") == [None]
+    assert record.get_holdings_isil_latest_change_iso("DE-2") == [None]
+    assert record.get_holdings_iln_latest_change_datetime("20") == [CHANGED]
+    assert record.get_holdings_iln_latest_change_datetime("21") == [None]
+    assert record.get_holdings_iln_latest_change_iso("21") == [None]
+    assert record.get_holdings_eln_latest_change_datetime("2000") == [CHANGED]
+    assert record.get_holdings_eln_latest_change_datetime("2100") == [None]
+    assert record.get_holdings_eln_latest_change_iso("2100") == [None]
+
+
+def test_holding_without_new_date():
+    record = PicaJson(RECORD)
+    assert record.get_holdings_isil_new_date_date("DE-14") == [datetime.date(2019, 2, 10)]
+    assert record.get_holdings_isil_new_date_iso("DE-14") == ["2019-02-10"]
+    assert record.get_holdings_isil_new_date_date("DE-2") == [None]
+    assert record.get_holdings_isil_new_date_iso("DE-2") == [None]
+
+
+def test_holding_without_subfield():
+    record = PicaJson(RECORD)
+    assert record.get_holdings_status() == ["", ""]
+    assert record.get_holdings_epn_status("500000") == ""
+    assert record.get_holdings_isil_status("DE-2") == [""]
+    assert record.get_holdings_epn_signature("500001") == "SIG 1"
+    # fields missing from a holding stay None
+    assert record.get_holdings_isil_new_key("DE-2") == [None]
@@ -0,0 +1,38 @@
+from serialj import PicaJson
+from serialj import instrument
+
+
+RECORD = [["003@", "", "0", "123456789"]]
+
+
+def _calls():
+    entry = instrument.summary().get("PicaJson.get_ppn")
+    return 0 if entry is None else entry["calls"]
+
+
+def test_nested_contexts():
+    instrument.reset()
+    original = PicaJson.get_ppn
+    with instrument.instrumented():
+        with instrument.instrumented(pattern="get_ppn"):
+            PicaJson(RECORD).get_ppn()
+        assert instrument.enabled()
+        PicaJson(RECORD).get_ppn()
+        assert _calls() == 2
+    assert not instrument.enabled()
+    assert PicaJson.get_ppn is original
+    PicaJson(RECORD).get_ppn()
+    assert _calls() == 2
+
+
+def test_enable_disable_counted():
+    instrument.reset()
+    instrument.enable(classes=[PicaJson], dates=False)
+    instrument.enable()
+    instrument.disable()
+    PicaJson(RECORD).get_ppn()
+    instrument.disable()
+    assert not instrument.enabled()
+    instrument.disable()
+    assert not instrument.enabled()
+    assert _calls() == 1
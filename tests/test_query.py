@@ -0,0 +1,122 @@
+import json
+
+import pytest
+
+from serialj import MarcJson, PicaJson, Query
+from serialj.lazy import LazyPicaJson
+from serialj.query import compile_query
+
+
+PICA = [
+    ["002@", "", "0", "Oau"],
+    ["003@", "", "0", "123456789"],
+    ["045R", "", "a", "ST 250", "9", "1"],
+    ["045R", "", "a", "XY 100"],
+    ["045R", "", "9", "2"],
+    ["101@", "", "a", "20"],
+    ["208@", "01", "a", "10-02-19", "b", "a0"],
+    ["209A", "01", "B", "DE-14", "a", "SIG 0", "d", "u"],
+    ["209A", "02", "B", "DE-15", "a", "SIG 1"],
+]
+
+MARC = [
+    ["001", None, None, "_", "123456789"],
+    ["924", "0", " ", "a", "10", "b", "DE-14"],
+    ["924", "1", " ", "a", "11", "b", "DE-15"],
+]
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("003@", True),
+    ("004A", False),
+    ("045R$a", True),
+    ("045R$b", False),
+    ("045R$a == 'ST 250'", True),
+    ("045R$a == 'ST'", False),
+    ("045R$a =^ 'XY'", True),
+    ("045R$a =$ '250'", True),
+    ("045R$a =? 'T 2'", True),
+    ("045R$a =~ '^[A-Z]{2} [0-9]+$'", True),
+    ("045R$a =~ '^ST$'", False),
+    ("045R$a like 'S? 2*'", True),
+    ("045R$a like 'ST'", False),
+    ("002@$0 == \"Oau\"", True),
+    ("209A/01$B == 'DE-14'", True),
+    ("209A/02$B == 'DE-14'", False),
+    ("209A/01-09$B == 'DE-15'", True),
+    ("209A/10-19$B == 'DE-15'", False),
+    ("209A/*$B == 'DE-15'", True),
+    ("209A{$B == 'DE-14' && $a =^ 'SIG'}", True),
+    ("209A{$B == 'DE-15' && $d == 'u'}", False),
+    ("209A{$B == 'DE-15' && $d != 'u'}", True),
+    ("209A{$B == 'DE-14' && !$d}", False),
+    ("209A/01$B == 'DE-14' && 208@/01$b like 'a*'", True),
+    ("004A || 003@", True),
+    ("!004A", True),
+    ("!(004A || 003@)", False),
+    ("(004A or 003@) and not 002@$0 =^ 'A'", True),
+])
+def test_operators(query, expected):
+    assert Query(query)(PicaJson(PICA)) is expected
+
+
+@pytest.mark.parametrize("query, expected", [
+    # none of the values of any 045R is equal
+    ("045R$a != 'ST 250'", False),
+    ("045R$a != 'XY 100'", False),
+    ("045R$a != 'ST 100'", True),
+    ("045R$9 != '1'", False),
+    ("004A$a != 'ST 250'", True),
+    ("209A/02$B != 'DE-14'", True),
+    ("209A/01$B != 'DE-14'", False),
+    ("!045R$a != 'ST 250'", True),
+])
+def test_not_equal(query, expected):
+    assert Query(query)(PicaJson(PICA)) is expected
+    assert Query(query)(PicaJson(PICA)) is not Query(query.replace("!=", "=="))(PicaJson(PICA))
+
+
+def test_marc():
+    record = MarcJson(MARC)
+    assert Query("924/0$b == 'DE-14'")(record)
+    assert not Query("924/0$b == 'DE-15'")(record)
+    assert Query("924{$a == '11' && $b == 'DE-15'}")(record)
+    assert not Query("924$b != 'DE-15'")(record)
+
+
+def test_lazy_record():
+    record = LazyPicaJson(json.dumps(PICA).encode("utf-8"))
+    assert Query("045R$a =^ 'ST' && 209A/02$B == 'DE-15'")(record)
+    assert Query("045R$a != 'AB'")(record)
+
+
+def test_filter():
+    records = [PicaJson(PICA), PicaJson(PICA[:2])]
+    assert list(Query("045R").filter(records)) == records[:1]
+    assert list(Query("!045R").filter(records)) == records[1:]
+
+
+@pytest.mark.parametrize("query", [
+    "",
+    "003@ &&",
+    "045R$a ==",
+    "045R$a == ST",
+    "045R$a === 'ST'",
+    "(003@",
+    "209A{$B == 'DE-14'",
+    "003@ xor 004A",
+    "045R$a == 'ST' 'XY'",
+    "'ST'",
+])
+def test_invalid(query):
+    with pytest.raises(ValueError):
+        Query(query)
+
+
+def test_compile_query():
+    query = Query("003@")
+    assert compile_query(query) is query
+    assert isinstance(compile_query("003@"), Query)
+    assert compile_query(len) is len
+    with pytest.raises(ValueError):
+        compile_query(1)
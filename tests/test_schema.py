@@ -0,0 +1,158 @@
+import inspect
+import logging
+
+import pytest
+
+from serialj import MarcJson, PicaJson
+from serialj.schema import Schema
+
+
+PICA = [
+    ["001B", "", "0", "1999:04-07-21", "t", "13:39:05.000"],
+    ["003@", "", "0", "123456789"],
+    ["021A", "", "a", "Title", "h", "Author"],
+    ["045R", "", "a", "ST 250", "a", "ST 300"],
+    ["101@", "", "a", "20"],
+    ["201B", "01", "0", "10-06-20", "t", "11:00:33.000"],
+    ["203@", "01", "0", "500000"],
+    ["209A", "01", "B", "DE-14", "a", "SIG 0", "D", "u"],
+    ["203@", "02", "0", "500001"],
+    ["209A", "02", "B", "DE-14", "a", "SIG 1", "a", "SIG 2"],
+    ["101@", "", "a", "21"],
+    ["203@", "01", "0", "500002"],
+    ["209A", "01", "B", "DE-2", "a", "SIG 3"],
+]
+
+MARC = [
+    ["001", None, None, "_", "123456789"],
+    ["005", None, None, "_", "20200610110033.0"],
+    ["008", None, None, "_", "200610s2020    gw            000 0 ger d"],
+    ["245", "1", "0", "a", "Title", "c", "Author"],
+    ["924", "0", " ", "a", "500000", "b", "DE-14", "g", "SIG 0", "g", "SIG 1"],
+    ["924", "1", " ", "a", "500001", "b", "DE-2"],
+]
+
+PICA_SCHEMA = {
+    "001B": {"required": True, "subfields": {"0": {}, "t": {}}},
+    "003@": {"required": True, "subfields": {"0": {"required": True, "pattern": "^[0-9]+X?$"}}},
+    "021A": {"subfields": {"a": {"required": True}, "h": {}}},
+    "045R": {"repeatable": True, "subfields": {"a": {"repeatable": True}}},
+    "101@": {"subfields": {"a": {}}},
+    "201B/01-99": {"subfields": {"0": {}, "t": {}}},
+    "203@/01-99": {"subfields": {"0": {}}},
+    "209A/01-99": {"subfields": {"B": {"codes": {"DE-14": {}, "DE-2": {}}}, "a": {"repeatable": True}, "D": {}}},
+}
+
+MARC_SCHEMA = {
+    "001": {"required": True, "subfields": {"_": {}}},
+    "005": {"subfields": {"_": {}}},
+    "008": {"subfields": {"_": {}}},
+    "245": {"indicator1": {"codes": {"0": {}, "1": {}}}, "subfields": {"a": {}, "c": {}}},
+    "924": {"repeatable": True, "subfields": {"a": {}, "b": {}, "g": {"repeatable": True}}},
+}
+
+
+def _codes(issues):
+    return sorted((issue.field, issue.subfield, issue.code) for issue in issues)
+
+
+def _changed(data, index, row):
+    data = [list(r) for r in data]
+    if row is None:
+        del data[index]
+    else:
+        data[index] = row
+    return data
+
+
+def test_valid_records_are_trusted():
+    pica = PicaJson(PICA)
+    marc = MarcJson(MARC)
+    assert Schema(PICA_SCHEMA).validate(pica) == []
+    assert Schema(MARC_SCHEMA).validate(marc) == []
+    assert pica.trusted and marc.trusted
+    assert pica.view("20").trusted
+
+
+@pytest.mark.parametrize("index, row, expected", [
+    (1, ["003@", "", "0", "12345678Y"], [("003@", "0", "invalid-value")]),
+    (1, None, [("003@", None, "missing-field")]),
+    (2, ["021A", "", "h", "Author"], [("021A", "a", "missing-subfield")]),
+    (2, ["021A", "", "a", "Title", "a", "Other"], [("021A", "a", "nonrepeatable-subfield")]),
+    (2, ["021A", "", "a", "Title", "x", "?"], [("021A", "x", "undefined-subfield")]),
+    (2, ["022A", "", "a", "Title"], [("022A", None, "undefined-field")]),
+    (2, ["021A", "", "a"], [("021A", None, "malformed-field")]),
+    (2, ["021A", " ", "a", "Title"], [("021A", None, "malformed-field")]),
+    (2, ["021A", "", "ab", "Title"], [("021A", "ab", "malformed-subfield")]),
+    (2, ["021A", "", "a", 1], [("021A", "a", "malformed-subfield")]),
+    (12, ["209A", "01", "B", "DE-99"], [("209A/01", "B", "invalid-value")]),
+    (12, ["209A", "02", "B", "DE-2"], []),
+    (9, ["209A", "01", "B", "DE-14"], [("209A/01", None, "nonrepeatable-field")]),
+])
+def test_pica_issues(index, row, expected):
+    record = PicaJson(_changed(PICA, index, row))
+    assert _codes(Schema(PICA_SCHEMA).validate(record)) == sorted(expected)
+    assert record.trusted is (expected == [])
+
+
+@pytest.mark.parametrize("index, row, expected", [
+    (0, None, [("001", None, "missing-field")]),
+    (3, ["245", "2", "0", "a", "Title"], [("245", None, "invalid-indicator")]),
+    (3, ["245", "1", "\t", "a", "Title"], [("245", None, "malformed-field")]),
+    (3, ["245", "1", "0", "a", "Title", "a", "Other"], [("245", "a", "nonrepeatable-subfield")]),
+])
+def test_marc_issues(index, row, expected):
+    record = MarcJson(_changed(MARC, index, row))
+    assert _codes(Schema(MARC_SCHEMA).validate(record)) == sorted(expected)
+    assert record.trusted is (expected == [])
+
+
+def test_ignore_unknown():
+    record = PicaJson(PICA + [["999Z", "", "a", "x"]])
+    schema = Schema(PICA_SCHEMA, ignore_unknown_fields=True, ignore_unknown_subfields=True)
+    assert schema.validate(record) == []
+    record = PicaJson(PICA + [["999Z", "", "a"]])
+    assert _codes(schema.validate(record)) == [("999Z", None, "malformed-field")]
+
+
+def test_validate_many():
+    records = [PicaJson(PICA), PicaJson(_changed(PICA, 1, None)), PicaJson(PICA)]
+    issues = Schema(PICA_SCHEMA).validate_many(records)
+    assert [(issue.record, issue.code) for issue in issues] == [(1, "missing-field")]
+    assert [record.trusted for record in records] == [True, False, True]
+
+
+ARGUMENTS = {"epn": ["500000", "500001", "x"], "isil": ["DE-14", "DE-2", "DE-99"], "iln": ["20", "21"], "eln": ["1999"]}
+
+
+def _getter_results(record):
+    results = {}
+    for name, func in inspect.getmembers(record.__class__, inspect.isfunction):
+        if not name.startswith("get_") or name in ("get_field", "get_value", "get_issues"):
+            continue
+        required = [p for p in list(inspect.signature(func).parameters.values())[1:] if p.default is p.empty]
+        for arg in ARGUMENTS.get(required[0].name, []) if required else [None]:
+            try:
+                results[name, arg] = func(record, arg) if required else func(record)
+            except Exception as err:
+                results[name, arg] = type(err)
+    return results
+
+
+@pytest.mark.parametrize("cls, data, schema", [(PicaJson, PICA, PICA_SCHEMA), (MarcJson, MARC, MARC_SCHEMA)])
+def test_trusted_getters_equal_untrusted(cls, data, schema):
+    logging.disable(logging.CRITICAL)
+    try:
+        untrusted = cls(data)
+        trusted = cls(data)
+        Schema(schema).validate(trusted)
+        assert trusted.trusted and not untrusted.trusted
+        assert _getter_results(trusted) == _getter_results(untrusted)
+        if cls is PicaJson:
+            for occurrence in (None, "01", "02", "99"):
+                assert trusted.get_field("209A", occurrence=occurrence) == untrusted.get_field("209A", occurrence=occurrence)
+        else:
+            for indicator1, indicator2 in ((None, None), ("0", None), ("1", " "), (None, "0"), ("1", "0")):
+                assert trusted.get_field("924", indicator1, indicator2) == untrusted.get_field("924", indicator1, indicator2)
+    finally:
+        logging.disable(logging.NOTSET)
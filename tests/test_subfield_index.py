@@ -0,0 +1,73 @@
+import pytest
+
+from serialj import MarcJson, PicaJson
+from serialj.compact import CompactPicaJson
+
+
+PICA = [
+    ["003@", "", "0", "123456789"],
+    ["045R", "", "a", "ST 250", "a", "ST 251"],
+    ["045R", "", "a", "XY 100"],
+    ["045R", "", "9", "2"],
+    ["101@", "", "a", "20"],
+    ["203@", "01", "0", "500000"],
+    ["209A", "01", "B", "DE-14", "a", "SIG 0"],
+    ["101@", "", "a", "21"],
+    ["203@", "01", "0", "500001"],
+    ["209A", "01", "B", "DE-15"],
+    ["209A", "02", "B", "DE-15", "a", "SIG 2"],
+]
+
+MARC = [
+    ["001", None, None, "_", "123456789"],
+    ["924", "0", " ", "a", "10", "b", "DE-14", "g", "SIG 0", "g", "SIG 1"],
+    ["924", "1", " ", "a", "11", "b", "DE-15"],
+]
+
+OPTIONS = [{}, {"repeat": False}, {"collapse": True}, {"repeat": False, "collapse": True}]
+
+
+@pytest.mark.parametrize("options", OPTIONS)
+@pytest.mark.parametrize("field, subfield, occurrence", [
+    ("045R", "a", None), ("045R", "9", None), ("209A", "a", "01"), ("209A", "B", None), ("203@", "0", "01"), ("999X", "a", None),
+])
+def test_pica_values(field, subfield, occurrence, options):
+    plain = PicaJson(PICA)
+    for record in (PicaJson(PICA, subfield_index=True), CompactPicaJson(PICA, subfield_index=True)):
+        expected = plain.get_value(field, subfield, occurrence=occurrence, **options)
+        assert record.get_value(field, subfield, occurrence=occurrence, **options) == expected
+        assert record.get_value(field, subfield, occurrence=occurrence, **options) == expected
+
+
+@pytest.mark.parametrize("options", OPTIONS)
+@pytest.mark.parametrize("field, subfield, indicator1", [("924", "g", None), ("924", "b", "0"), ("924", "b", None), ("999", "a", None)])
+def test_marc_values(field, subfield, indicator1, options):
+    plain = MarcJson(MARC)
+    record = MarcJson(MARC, subfield_index=True)
+    expected = plain.get_value(field, subfield, indicator1=indicator1, **options)
+    assert record.get_value(field, subfield, indicator1=indicator1, **options) == expected
+    assert record.get_value(field, subfield, indicator1=indicator1, **options) == expected
+
+
+def test_values_are_cached_once():
+    record = PicaJson(PICA, subfield_index=True)
+    assert record.get_holdings_isil() == ["DE-14", "DE-15"]
+    assert record.get_holdings_isil_count() == 2
+    assert record.get_holdings_isil_index("DE-15") == [1]
+    assert list(record.subidx) == [("209A", "B", "01")]
+
+
+def test_returned_values_are_copies():
+    record = PicaJson(PICA, subfield_index=True)
+    record.get_holdings_isil().append("DE-99")
+    record.get_value("045R", "a")[0].append("XX")
+    assert record.get_holdings_isil() == ["DE-14", "DE-15"]
+    assert record.get_value("045R", "a") == [["ST 250", "ST 251"], ["XY 100"], [""]]
+
+
+def test_views_have_own_index():
+    record = PicaJson(PICA, subfield_index=True)
+    assert record.get_holdings_epn() == ["500000", "500001"]
+    view = record.view("21")
+    assert view.get_holdings_epn() == ["500001"]
+    assert record.get_holdings_epn() == ["500000", "500001"]
@@ -0,0 +1,71 @@
+import json
+
+import pytest
+
+from serialj import PicaJson
+from serialj.compact import CompactData, CompactPicaJson
+from serialj.lazy import LazyPicaJson
+
+
+RECORD = [
+    ["003@", "", "0", "123456789"],
+    ["021A", "", "a", "Title"],
+    ["101@", "", "a", "20"],
+    ["201B", "01", "0", "10-06-20", "t", "11:00:33.000"],
+    ["203@", "01", "0", "500000"],
+    ["101@", "", "a", "21"],
+    ["203@", "01", "0", "500001"],
+    ["101@", "", "a", "20"],
+    ["203@", "01", "0", "500002"],
+    ["101@", "", "b", "x"],
+]
+
+EXPECTED = {
+    "20": RECORD[:2] + RECORD[2:5] + RECORD[7:9],
+    "21": RECORD[:2] + RECORD[5:7],
+    None: RECORD[:2] + RECORD[9:],
+}
+
+
+@pytest.mark.parametrize("record", [
+    PicaJson(RECORD),
+    CompactPicaJson(RECORD),
+    LazyPicaJson(json.dumps(RECORD)),
+], ids=["plain", "compact", "lazy"])
+def test_views(record):
+    for iln, rows in EXPECTED.items():
+        assert record.view(iln).data == rows
+    assert record.view("22") is None
+    views = record.views()
+    assert {iln: view.data for iln, view in views.items()} == EXPECTED
+    assert views["20"].get_holdings_epn() == ["500000", "500002"]
+
+
+def test_views_without_holdings():
+    assert PicaJson(RECORD[:2]).views() == {}
+    assert PicaJson(RECORD[:2]).view("20") is None
+
+
+def test_compact_views_create_rows_once(monkeypatch):
+    record = CompactPicaJson(RECORD)
+    created = []
+    getitem = CompactData.__getitem__
+    iterate = CompactData.__iter__
+
+    def counting_getitem(self, i):
+        created.append(i)
+        return getitem(self, i)
+
+    def counting_iter(self):
+        for row in iterate(self):
+            created.append(row[0])
+            yield row
+
+    monkeypatch.setattr(CompactData, "__getitem__", counting_getitem)
+    monkeypatch.setattr(CompactData, "__iter__", counting_iter)
+    record.views()
+    # 101@ rows to find the blocks, then all rows once
+    assert len(created) == 4 + len(RECORD)
+    del created[:]
+    record.view("21")
+    assert len(created) == 4
@@ -0,0 +1,74 @@
+import io
+import json
+
+import pytest
+
+from serialj import LazyPicaJson, PicaJson, stream_records, writer
+
+
+RECORDS = [
+    [
+        ["003@", "", "0", "123456789"],
+        ["021A", "", "a", "Price in $ and $$", "h", "Author"],
+        ["101@", "", "a", "20"],
+        ["209A", "01", "B", "DE-14", "a", "SIG $1"],
+    ],
+    [
+        ["003@", "", "0", "987654321"],
+        ["045R", "", "a", "ST 250", "a", "ST 300"],
+    ],
+]
+
+
+def _read_ndjson(path):
+    return [record.data for record in stream_records(str(path))]
+
+
+def test_ndjson_decoded(tmp_path):
+    path = tmp_path / "records.ndjson"
+    assert writer.write_records([PicaJson(data) for data in RECORDS], str(path)) == 2
+    assert _read_ndjson(path) == RECORDS
+
+
+def test_ndjson_raw_lazy(tmp_path):
+    path = tmp_path / "records.ndjson.gz"
+    records = [LazyPicaJson(json.dumps(data) + "\n") for data in RECORDS]
+    writer.write_records(records, str(path))
+    assert not any(record.decoded for record in records)
+    assert _read_ndjson(path) == RECORDS
+
+
+def test_ndjson_raw_lazy_multiline(tmp_path):
+    path = tmp_path / "records.ndjson"
+    records = [LazyPicaJson(json.dumps(data, indent=1).encode("utf-8")) for data in RECORDS]
+    writer.write_records(records, str(path))
+    assert _read_ndjson(path) == RECORDS
+
+
+def test_plain_round_trip():
+    out = io.BytesIO()
+    writer.write_records([PicaJson(data) for data in RECORDS], out, format="plain")
+    text = out.getvalue().decode("utf-8")
+    assert "$aPrice in $$ and $$$$" in text
+    assert [writer.parse_plain(record) for record in text.split("\n\n")[:-1]] == RECORDS
+
+
+def test_normalized_round_trip():
+    out = io.BytesIO()
+    writer.write_records(RECORDS, out, format="normalized")
+    lines = out.getvalue().decode("utf-8").split("\n")[:-1]
+    assert [writer.parse_normalized(line) for line in lines] == RECORDS
+
+
+@pytest.mark.parametrize("format, value", [
+    ("plain", "line1\nline2"),
+    ("plain", "line1\rline2"),
+    ("normalized", "line1\nline2"),
+    ("normalized", "a\x1eb"),
+    ("normalized", "a\x1fb"),
+])
+def test_invalid_values(format, value):
+    out = io.BytesIO()
+    with pytest.raises(ValueError):
+        writer.write_records([[["021A", "", "a", value]]], out, format=format)
+    assert out.getvalue() == b""